@@ -8,7 +8,7 @@ from .models import User, UserSession, PasswordResetToken
 class UserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'role', 'department', 'is_active', 'last_login')
     list_filter = ('role', 'department', 'is_active', 'is_staff', 'is_superuser')
-    search_fields = ('username', 'first_name', 'last_name', 'email', 'employee_id')
+    search_fields = ('username', 'email', 'employee_id', '^first_name', '^last_name')
     ordering = ('username',)
     
     fieldsets = (
@@ -37,6 +37,7 @@ class UserSessionAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'ip_address')
     readonly_fields = ('session_key', 'user_agent', 'login_time')
     ordering = ('-login_time',)
+    list_select_related = ('user',)
 
 
 @admin.register(PasswordResetToken)
@@ -44,5 +45,6 @@ class PasswordResetTokenAdmin(admin.ModelAdmin):
     list_display = ('user', 'created_at', 'expires_at', 'is_used')
     list_filter = ('is_used', 'created_at')
     search_fields = ('user__username', 'user__email')
-    readonly_fields = ('token', 'created_at')
+    readonly_fields = ('created_at',)
     ordering = ('-created_at',)
+    list_select_related = ('user',)
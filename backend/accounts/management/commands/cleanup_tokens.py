@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import PasswordResetToken, UserSession
+
+
+class Command(BaseCommand):
+    """
+    Prune used/expired password reset tokens and old closed user sessions.
+    
+    Intended to be scheduled (cron or Celery beat) so both tables stay bounded.
+    """
+    help = 'Delete used or expired password reset tokens and stale inactive user sessions'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--token-days',
+            type=int,
+            default=30,
+            help='Delete reset tokens that expired more than this many days ago (default: 30)'
+        )
+        parser.add_argument(
+            '--session-days',
+            type=int,
+            default=90,
+            help='Delete inactive sessions logged out more than this many days ago (default: 90)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Number of rows deleted per statement (default: 10000)'
+        )
+    
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+        
+        tokens = PasswordResetToken.objects.filter(
+            Q(is_used=True) | Q(expires_at__lt=now - timedelta(days=options['token_days']))
+        )
+        sessions = UserSession.objects.filter(
+            is_active=False,
+            logout_time__lt=now - timedelta(days=options['session_days'])
+        )
+        
+        deleted_tokens = self._delete_in_batches(tokens, batch_size)
+        deleted_sessions = self._delete_in_batches(sessions, batch_size)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted_tokens} password reset tokens and {deleted_sessions} user sessions"
+        ))
+    
+    def _delete_in_batches(self, queryset, batch_size):
+        """Delete matching rows in primary-key chunks to keep each statement short."""
+        model = queryset.model
+        total = 0
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return total
+            deleted, _ = model.objects.filter(pk__in=pks).delete()
+            total += deleted
@@ -1,9 +1,24 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.core.validators import MinLengthValidator
+from django.utils.crypto import salted_hmac
 from django.utils.translation import gettext_lazy as _
 
 
+IPSAS_PERMISSIONS = ('create', 'edit', 'delete', 'view', 'audit', 'approve')
+
+# Role to IPSAS permissions lookup; unknown roles fall back to viewer
+ROLE_PERMISSIONS = {
+    'admin': frozenset(IPSAS_PERMISSIONS),
+    'accountant': frozenset({'create', 'edit', 'view', 'delete'}),
+    'auditor': frozenset({'view', 'audit'}),
+    'manager': frozenset({'create', 'edit', 'view', 'approve'}),
+    'viewer': frozenset({'view'}),
+}
+
+
 class User(AbstractUser):
     """
     Custom user model with IPSAS financial software specific fields.
@@ -61,22 +76,25 @@ class User(AbstractUser):
         verbose_name = _('User')
         verbose_name_plural = _('Users')
         ordering = ['username']
+        indexes = [
+            # Trigram indexes for case-insensitive substring search (admin/API icontains)
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='user_uname_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_trgm'),
+            # Prefix indexes for the admin's ^first_name/^last_name (istartswith) search
+            models.Index(OpClass(Upper('first_name'), name='text_pattern_ops'), name='user_fname_prefix'),
+            models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='user_lname_prefix'),
+        ]
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.username})"
     
+    def get_ipsas_permissions(self):
+        """Get the set of IPSAS permissions granted by the user's role."""
+        return ROLE_PERMISSIONS.get(self.role, ROLE_PERMISSIONS['viewer'])
+    
     def has_ipsas_permission(self, permission):
         """Check if user has specific IPSAS permission."""
-        if self.role == 'admin':
-            return True
-        elif self.role == 'accountant':
-            return permission in ['create', 'edit', 'view', 'delete']
-        elif self.role == 'auditor':
-            return permission in ['view', 'audit']
-        elif self.role == 'manager':
-            return permission in ['create', 'edit', 'view', 'approve']
-        else:  # viewer
-            return permission == 'view'
+        return permission in self.get_ipsas_permissions()
 
 
 class UserSession(models.Model):
@@ -93,6 +111,9 @@ class UserSession(models.Model):
     
     class Meta:
         ordering = ['-login_time']
+        indexes = [
+            models.Index(fields=['user', 'is_active', '-login_time']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.login_time}"
@@ -103,17 +124,26 @@ class PasswordResetToken(models.Model):
     Secure password reset tokens.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    token = models.CharField(max_length=100, unique=True)
+    token_hash = models.BinaryField(max_length=32, unique=True)  # HMAC-SHA256 of the raw token
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
     is_used = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_used', 'expires_at']),
+            models.Index(fields=['user', 'is_used']),
+        ]
     
     def __str__(self):
         return f"Reset token for {self.user.username}"
     
+    @staticmethod
+    def hash_token(token):
+        """Get the HMAC-SHA256 digest stored for a raw reset token."""
+        return salted_hmac('accounts.PasswordResetToken', token, algorithm='sha256').digest()
+    
     def is_expired(self):
         from django.utils import timezone
         return timezone.now() > self.expires_at
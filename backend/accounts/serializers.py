@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.utils import timezone
 from .models import User, UserSession
 
 
@@ -17,6 +18,41 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'last_login', 'date_joined', 'created_at', 'updated_at']
 
 
+def _datetime_representation(value):
+    """Format a datetime the same way DRF's DateTimeField does by default."""
+    if not value:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def serialize_user(user):
+    """
+    Fast path equivalent to UserSerializer(user).data for read-only responses.
+    
+    Builds the flat payload directly instead of going through ModelSerializer
+    field introspection on latency-sensitive endpoints such as login.
+    """
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user.role,
+        'employee_id': user.employee_id,
+        'department': user.department,
+        'phone_number': user.phone_number,
+        'is_active': user.is_active,
+        'last_login': _datetime_representation(user.last_login),
+        'date_joined': _datetime_representation(user.date_joined),
+        'created_at': _datetime_representation(user.created_at),
+        'updated_at': _datetime_representation(user.updated_at),
+    }
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new users."""
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -90,9 +126,17 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
+class SessionUserSerializer(serializers.ModelSerializer):
+    """Slim user serializer for embedding in session listings."""
+    
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'email', 'role']
+
+
 class UserSessionSerializer(serializers.ModelSerializer):
     """Serializer for UserSession model."""
-    user = UserSerializer(read_only=True)
+    user = SessionUserSerializer(read_only=True)
     
     class Meta:
         model = UserSession
@@ -103,11 +147,6 @@ class UserSessionSerializer(serializers.ModelSerializer):
 class PasswordResetRequestSerializer(serializers.Serializer):
     """Serializer for requesting password reset."""
     email = serializers.EmailField()
-    
-    def validate_email(self, value):
-        if not User.objects.filter(email=value, is_active=True).exists():
-            raise serializers.ValidationError("No active user found with this email address")
-        return value
 
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
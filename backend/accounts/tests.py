@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import PasswordResetToken, User, UserSession
+
+PASSWORD = 'Ledger-Pass-2026'
+NEW_PASSWORD = 'Balanced-Books-2027'
+
+
+@override_settings(ROOT_URLCONF='accounts.urls')
+class AccountsTestCase(TestCase):
+    """Base test case with an API client and one active user."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='clerk',
+            email='clerk@example.org',
+            password=PASSWORD,
+            role='accountant',
+        )
+    
+    def setUp(self):
+        self.client = APIClient()
+
+
+class ConditionalUserResponseTests(AccountsTestCase):
+    """ETags on the current user and permissions endpoints."""
+    
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+    
+    def test_matching_etag_returns_not_modified(self):
+        for path in ['/users/me/', '/permissions/']:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag'])
+                
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.content)
+    
+    def test_role_change_changes_etag(self):
+        etag = self.client.get('/permissions/')['ETag']
+        
+        self.user.role = 'auditor'
+        self.user.save()
+        response = self.client.get('/permissions/', HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['role'], 'auditor')
+    
+    def test_profile_change_changes_etag(self):
+        etag = self.client.get('/users/me/')['ETag']
+        
+        self.user.department = 'Treasury'
+        self.user.save()
+        response = self.client.get('/users/me/', HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['department'], 'Treasury')
+
+
+class PasswordResetTests(AccountsTestCase):
+    """Requesting and confirming password resets."""
+    
+    def request_token(self):
+        with self.settings(DEBUG=True):
+            response = self.client.post('/password-reset/', {'email': self.user.email})
+        return response.data['token']
+    
+    def confirm(self, token):
+        return self.client.post('/password-reset/confirm/', {
+            'token': token,
+            'new_password': NEW_PASSWORD,
+            'new_password_confirm': NEW_PASSWORD,
+        })
+    
+    def test_only_token_digest_is_stored(self):
+        token = self.request_token()
+        
+        reset_token = PasswordResetToken.objects.get(user=self.user)
+        self.assertEqual(bytes(reset_token.token_hash), PasswordResetToken.hash_token(token))
+        self.assertNotIn(token.encode(), bytes(reset_token.token_hash))
+    
+    def test_token_is_only_returned_in_debug(self):
+        response = self.client.post('/password-reset/', {'email': self.user.email})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('token', response.data)
+    
+    def test_token_resets_password_once(self):
+        token = self.request_token()
+        
+        self.assertEqual(self.confirm(token).status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password(NEW_PASSWORD))
+        
+        self.assertEqual(self.confirm(token).status_code, 400)
+    
+    def test_expired_token_is_rejected(self):
+        token = self.request_token()
+        PasswordResetToken.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        
+        self.assertEqual(self.confirm(token).status_code, 400)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password(PASSWORD))
+    
+    def test_new_request_invalidates_earlier_token(self):
+        token = self.request_token()
+        self.request_token()
+        
+        self.assertEqual(self.confirm(token).status_code, 400)
+
+
+class LoginTests(AccountsTestCase):
+    """Session tracking on login."""
+    
+    def login(self, client):
+        return client.post('/login/', {'username': self.user.username, 'password': PASSWORD})
+    
+    def test_second_login_closes_earlier_session(self):
+        self.assertEqual(self.login(self.client).status_code, 200)
+        first = UserSession.objects.get(user=self.user)
+        
+        self.assertEqual(self.login(APIClient()).status_code, 200)
+        
+        first.refresh_from_db()
+        self.assertFalse(first.is_active)
+        self.assertIsNotNone(first.logout_time)
+        self.assertEqual(UserSession.objects.filter(user=self.user, is_active=True).count(), 1)
@@ -3,26 +3,69 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework.views import APIView
+from django.conf import settings
 from django.contrib.auth import login, logout
 from django.utils import timezone
 from django.db import transaction
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from django.utils.crypto import get_random_string
 from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from datetime import timedelta
+from functools import lru_cache
+import secrets
 
-from .models import User, UserSession, PasswordResetToken
+from .models import User, UserSession, PasswordResetToken, IPSAS_PERMISSIONS, ROLE_PERMISSIONS
 from .serializers import (
     UserSerializer, UserCreateSerializer, UserUpdateSerializer,
     ChangePasswordSerializer, LoginSerializer, UserSessionSerializer,
-    PasswordResetRequestSerializer, PasswordResetConfirmSerializer
+    PasswordResetRequestSerializer, PasswordResetConfirmSerializer, serialize_user
 )
 
 
+def _get_client_ip(request):
+    """Get the client IP address, honouring X-Forwarded-For; memoized on the request."""
+    ip = getattr(request, '_cached_client_ip', None)
+    if ip:
+        return ip
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip = x_forwarded_for.partition(',')[0].strip()
+    else:
+        ip = request.META.get('REMOTE_ADDR')
+    request._cached_client_ip = ip
+    return ip
+
+
+def _user_etag(user):
+    """Get a weak ETag that changes whenever the user's record or last login changes."""
+    last_login = user.last_login.timestamp() if user.last_login else 0
+    return f'W/"{user.pk}-{user.updated_at.timestamp()}-{last_login}"'
+
+
+def _conditional_user_response(request, get_data):
+    """
+    Build a privately cacheable response for data derived from the current user.
+    
+    Returns 304 Not Modified without calling get_data when the client's
+    If-None-Match already matches the user's ETag.
+    """
+    etag = _user_etag(request.user)
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(get_data())
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=60)
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+
 class UserListView(generics.ListCreateAPIView):
     """List and create users."""
-    queryset = User.objects.all()
+    # Only load the columns UserSerializer renders (never the password hash)
+    queryset = User.objects.only(*UserSerializer.Meta.fields)
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
     filterset_fields = ['role', 'department', 'is_active']
@@ -33,7 +76,7 @@ class UserListView(generics.ListCreateAPIView):
 
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, or delete a user."""
-    queryset = User.objects.all()
+    queryset = User.objects.only(*UserSerializer.Meta.fields)
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -90,37 +133,42 @@ class LoginView(APIView):
         if serializer.is_valid():
             user = serializer.validated_data['user']
             login(request, user)
+            ip_address = _get_client_ip(request)
             
-            # Create or get token
-            token, created = Token.objects.get_or_create(user=user)
-            
-            # Track session
-            session = UserSession.objects.create(
-                user=user,
-                session_key=request.session.session_key or get_random_string(40),
-                ip_address=self._get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', '')
-            )
+            # Make sure Django has assigned a real session key, so LogoutView can match it
+            if not request.session.session_key:
+                request.session.save()
             
-            # Update user's last login IP
-            user.last_login_ip = self._get_client_ip(request)
-            user.save(update_fields=['last_login_ip'])
+            # Token, session tracking and login IP are committed together
+            with transaction.atomic():
+                # Create or get token
+                token, created = Token.objects.get_or_create(user=user)
+                
+                # Close earlier sessions; the auth token is shared per user anyway
+                UserSession.objects.filter(user=user, is_active=True).update(
+                    is_active=False,
+                    logout_time=timezone.now()
+                )
+                
+                # Track session
+                session = UserSession.objects.create(
+                    user=user,
+                    session_key=request.session.session_key,
+                    ip_address=ip_address,
+                    user_agent=request.META.get('HTTP_USER_AGENT', '')
+                )
+                
+                # Update user's last login IP without a full save cycle
+                User.objects.filter(pk=user.pk).update(last_login_ip=ip_address)
+                user.last_login_ip = ip_address
             
             return Response({
                 'token': token.key,
-                'user': UserSerializer(user).data,
+                'user': serialize_user(user),
                 'message': 'Login successful'
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-    def _get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
 
 
 class LogoutView(APIView):
@@ -129,23 +177,14 @@ class LogoutView(APIView):
     
     def post(self, request):
         # End current session
-        try:
-            session = UserSession.objects.get(
-                user=request.user,
-                session_key=request.session.session_key,
-                is_active=True
-            )
-            session.logout_time = timezone.now()
-            session.is_active = False
-            session.save()
-        except UserSession.DoesNotExist:
-            pass
+        UserSession.objects.filter(
+            user=request.user,
+            session_key=request.session.session_key,
+            is_active=True
+        ).update(logout_time=timezone.now(), is_active=False)
         
         # Delete token
-        try:
-            request.user.auth_token.delete()
-        except:
-            pass
+        Token.objects.filter(user=request.user).delete()
         
         logout(request)
         return Response({'message': 'Logout successful'})
@@ -156,8 +195,7 @@ class CurrentUserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        serializer = UserSerializer(request.user)
-        return Response(serializer.data)
+        return _conditional_user_response(request, lambda: serialize_user(request.user))
 
 
 class PasswordResetRequestView(APIView):
@@ -168,31 +206,34 @@ class PasswordResetRequestView(APIView):
         serializer = PasswordResetRequestSerializer(data=request.data)
         if serializer.is_valid():
             email = serializer.validated_data['email']
-            try:
-                user = User.objects.get(email=email, is_active=True)
-                
-                # Create reset token
-                token = get_random_string(64)
+            user = User.objects.filter(email=email, is_active=True).only('id').first()
+            
+            # Same response whether or not the account exists, so the
+            # endpoint cannot be used to enumerate registered emails
+            data = {
+                'message': 'If an account with this email exists, a password reset email has been sent.'
+            }
+            
+            if user:
+                # Create reset token; only its digest is stored
+                token = secrets.token_urlsafe(48)
                 expires_at = timezone.now() + timedelta(hours=24)
                 
+                # Invalidate any earlier outstanding tokens for this user
+                PasswordResetToken.objects.filter(user=user, is_used=False).update(is_used=True)
+                
                 PasswordResetToken.objects.create(
                     user=user,
-                    token=token,
+                    token_hash=PasswordResetToken.hash_token(token),
                     expires_at=expires_at
                 )
                 
                 # TODO: Send email with reset link
-                # For now, just return the token (in production, send via email)
-                
-                return Response({
-                    'message': 'Password reset email sent',
-                    'token': token  # Remove this in production
-                })
-                
-            except User.DoesNotExist:
-                return Response({
-                    'message': 'If an account with this email exists, a password reset email has been sent.'
-                })
+                # Until email delivery exists, expose the token in development only
+                if settings.DEBUG:
+                    data['token'] = token
+            
+            return Response(data)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -208,20 +249,22 @@ class PasswordResetConfirmView(APIView):
             new_password = serializer.validated_data['new_password']
             
             try:
-                reset_token = PasswordResetToken.objects.get(
-                    token=token,
-                    is_used=False,
-                    expires_at__gt=timezone.now()
-                )
-                
-                # Update password
-                user = reset_token.user
-                user.set_password(new_password)
-                user.save()
-                
-                # Mark token as used
-                reset_token.is_used = True
-                reset_token.save()
+                # Lock the token row so concurrent requests cannot reuse it
+                with transaction.atomic():
+                    reset_token = PasswordResetToken.objects.select_for_update(skip_locked=True).get(
+                        token_hash=PasswordResetToken.hash_token(token),
+                        is_used=False,
+                        expires_at__gt=timezone.now()
+                    )
+                    
+                    # Update password
+                    user = reset_token.user
+                    user.set_password(new_password)
+                    user.save()
+                    
+                    # Mark token as used
+                    reset_token.is_used = True
+                    reset_token.save(update_fields=['is_used'])
                 
                 return Response({'message': 'Password reset successful'})
                 
@@ -235,26 +278,33 @@ class PasswordResetConfirmView(APIView):
 
 class UserSessionListView(generics.ListAPIView):
     """List user sessions for audit purposes."""
-    queryset = UserSession.objects.all()
     serializer_class = UserSessionSerializer
     permission_classes = [permissions.IsAdminUser]
     filterset_fields = ['user', 'is_active', 'login_time']
     ordering = ['-login_time']
 
+    def get_queryset(self):
+        # Fetch the nested user in the same query, limited to serialized columns
+        return UserSession.objects.select_related('user').only(
+            'id', 'ip_address', 'login_time', 'logout_time', 'is_active',
+            'user__id', 'user__username', 'user__email', 'user__role'
+        )
+
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_permissions(request):
     """Get current user's permissions."""
     user = request.user
-    permissions = {
-        'can_create': user.has_ipsas_permission('create'),
-        'can_edit': user.has_ipsas_permission('edit'),
-        'can_delete': user.has_ipsas_permission('delete'),
-        'can_view': user.has_ipsas_permission('view'),
-        'can_audit': user.has_ipsas_permission('audit'),
-        'can_approve': user.has_ipsas_permission('approve'),
-        'role': user.role,
-        'is_admin': user.is_superuser or user.role == 'admin'
-    }
-    return Response(permissions)
+    is_admin = user.is_superuser or user.role == 'admin'
+    return _conditional_user_response(request, lambda: dict(_permissions_payload(user.role, is_admin)))
+
+
+@lru_cache(maxsize=16)
+def _permissions_payload(role, is_admin):
+    """Build the permissions payload for a role; cached since it only depends on its arguments."""
+    perms = ROLE_PERMISSIONS.get(role, ROLE_PERMISSIONS['viewer'])
+    permissions = {f'can_{action}': action in perms for action in IPSAS_PERMISSIONS}
+    permissions['role'] = role
+    permissions['is_admin'] = is_admin
+    return permissions
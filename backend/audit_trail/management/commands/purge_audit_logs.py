@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from audit_trail.models import AuditLog
+
+
+class Command(BaseCommand):
+    """
+    Delete audit logs older than the configured retention window.
+    
+    Intended to be scheduled (cron or Celery beat) so the audit tables and
+    their indexes stay bounded.
+    """
+    help = 'Delete audit logs (and their field changes) older than AUDIT_LOG_RETENTION_DAYS'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.AUDIT_LOG_RETENTION_DAYS,
+            help=f'Delete audit logs older than this many days (default: {settings.AUDIT_LOG_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of audit logs deleted per statement (default: 5000)'
+        )
+    
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        expired = AuditLog.objects.filter(timestamp__lt=cutoff).order_by()
+        
+        total = 0
+        while True:
+            pks = list(expired.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            AuditLog.objects.filter(pk__in=pks).delete()
+            total += len(pks)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {total} audit logs older than {cutoff:%Y-%m-%d}"
+        ))
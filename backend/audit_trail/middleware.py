@@ -0,0 +1,138 @@
+"""
+Request-scoped audit trail buffering.
+
+Views record audit entries on ``request.audit_buffer`` instead of inserting
+them one by one; the middleware writes everything collected during the
+request with a couple of bulk INSERTs once the response is ready.
+"""
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AuditLog, DataChangeLog
+
+AUDIT_BATCH_SIZE = 500
+
+
+def _get_client_ip(request):
+    """Get the client IP address, honouring X-Forwarded-For."""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.partition(',')[0].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+class AuditBuffer:
+    """
+    Collects AuditLog rows and their DataChangeLog rows for bulk insertion.
+    
+    Entries share the buffer's timestamp, taken once when it is created, so
+    every entry recorded for one request carries the same time.
+    """
+    
+    def __init__(self, request=None):
+        self.request = request
+        self.timestamp = timezone.now()
+        self.entries = []
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def add(self, audit_log, changes=()):
+        """Queue an unsaved AuditLog together with its unsaved DataChangeLog rows."""
+        self.entries.append((audit_log, list(changes)))
+    
+    def log(self, action, obj, old_values=None, new_values=None, change_message='', **extra):
+        """
+        Queue an audit entry for obj, filling in request details.
+        
+        A DataChangeLog row is queued for every key whose value differs
+        between old_values and new_values.
+        """
+        old_values = old_values or {}
+        new_values = new_values or {}
+        changed_fields = [
+            field for field in dict.fromkeys([*old_values, *new_values])
+            if old_values.get(field) != new_values.get(field)
+        ]
+        
+        extra.setdefault('timestamp', self.timestamp)
+        request = self.request
+        if request is not None:
+            user = request.user if request.user.is_authenticated else None
+            extra.setdefault('user', user)
+            extra.setdefault('session_id', request.session.session_key or '')
+            extra.setdefault('ip_address', _get_client_ip(request))
+            extra.setdefault('user_agent', request.META.get('HTTP_USER_AGENT', ''))
+            extra.setdefault('request_path', request.path[:500])
+            extra.setdefault('request_method', request.method)
+        
+        audit_log = AuditLog(
+            action=action,
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.pk,
+            object_repr=str(obj)[:200],
+            change_message=change_message,
+            values={
+                'old': old_values,
+                'new': new_values,
+                'changed': changed_fields,
+            } if old_values or new_values else None,
+            **extra
+        )
+        changes = [
+            DataChangeLog(
+                field_name=field,
+                old_value='' if old_values.get(field) is None else str(old_values.get(field)),
+                new_value='' if new_values.get(field) is None else str(new_values.get(field)),
+            )
+            for field in changed_fields
+        ]
+        self.add(audit_log, changes)
+        return audit_log
+    
+    def flush(self):
+        """Write all queued entries in one transaction and empty the buffer."""
+        if not self.entries:
+            return
+        
+        entries, self.entries = self.entries, []
+        with transaction.atomic():
+            # PostgreSQL returns the new primary keys, so the change rows can
+            # reference their audit logs without re-querying
+            audit_logs = AuditLog.objects.bulk_create(
+                [audit_log for audit_log, _ in entries],
+                batch_size=AUDIT_BATCH_SIZE
+            )
+            data_changes = []
+            for audit_log, (_, changes) in zip(audit_logs, entries):
+                for change in changes:
+                    change.audit_log = audit_log
+                    data_changes.append(change)
+            if data_changes:
+                DataChangeLog.objects.bulk_create(data_changes, batch_size=AUDIT_BATCH_SIZE)
+
+
+class AuditTrailMiddleware:
+    """
+    Attach an AuditBuffer to each request and flush it after the view runs.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.content_types_loaded = False
+    
+    def __call__(self, request):
+        if not self.content_types_loaded:
+            # Fill ContentType's in-process cache with one query, so
+            # AuditBuffer.log never has to look a content type up mid-request.
+            # Done on the first request rather than at load time, so a
+            # preloading server doesn't open a connection its workers inherit
+            ContentType.objects.get_for_models(*apps.get_models())
+            self.content_types_loaded = True
+        
+        request.audit_buffer = AuditBuffer(request)
+        response = self.get_response(request)
+        request.audit_buffer.flush()
+        return response
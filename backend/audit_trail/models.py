@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.utils.translation import gettext_lazy as _
@@ -6,6 +7,25 @@ from django.utils import timezone
 import json
 
 
+class AuditLogQuerySet(models.QuerySet):
+    """QuerySet helpers for audit log listings."""
+    
+    def with_targets(self):
+        """
+        Load users, content types and the audited objects up front.
+        
+        The generic content_object is prefetched with one query per distinct
+        content type instead of one query per log row.
+        """
+        return self.select_related('user', 'content_type').prefetch_related('content_object')
+    
+    def with_changes(self):
+        """Prefetch the per-field change rows used by get_changes_summary()."""
+        return self.prefetch_related(
+            models.Prefetch('data_changes', queryset=DataChangeLog.objects.order_by('field_name'))
+        )
+
+
 class AuditLog(models.Model):
     """
     Comprehensive audit log for all system changes.
@@ -51,10 +71,8 @@ class AuditLog(models.Model):
     object_repr = models.CharField(max_length=200)
     change_message = models.TextField(blank=True)
     
-    # Data changes (JSON fields for flexibility)
-    old_values = models.JSONField(null=True, blank=True)
-    new_values = models.JSONField(null=True, blank=True)
-    changed_fields = models.JSONField(null=True, blank=True)
+    # Data changes, stored as one JSON document: {"old": {...}, "new": {...}, "changed": [...]}
+    values = models.JSONField(null=True, blank=True)
     
     # Additional context
     module = models.CharField(max_length=100, blank=True)
@@ -66,29 +84,54 @@ class AuditLog(models.Model):
     is_system_action = models.BooleanField(default=False)
     related_objects = models.JSONField(null=True, blank=True)
     
+    objects = AuditLogQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Audit Log')
         verbose_name_plural = _('Audit Logs')
         ordering = ['-timestamp']
         indexes = [
             models.Index(fields=['timestamp', 'user', 'action']),
-            models.Index(fields=['content_type', 'object_id']),
+            # Rows arrive in timestamp order, so a BRIN index covers date-range
+            # scans and retention deletes at a tiny fraction of a btree's size
+            BrinIndex(fields=['timestamp'], name='al_timestamp_brin'),
+            # Covers per-object history lookups without touching the heap (PostgreSQL INCLUDE)
+            models.Index(
+                fields=['content_type', 'object_id', '-timestamp'],
+                include=['action', 'user'],
+                name='al_gfk_cover'
+            ),
             models.Index(fields=['module', 'function']),
         ]
     
     def __str__(self):
         return f"{self.action} by {self.user} on {self.object_repr} at {self.timestamp}"
     
+    @property
+    def old_values(self):
+        """Field values before the change."""
+        return (self.values or {}).get('old')
+    
+    @property
+    def new_values(self):
+        """Field values after the change."""
+        return (self.values or {}).get('new')
+    
+    @property
+    def changed_fields(self):
+        """Names of the fields whose value changed."""
+        return (self.values or {}).get('changed')
+    
     def get_changes_summary(self):
-        """Get a summary of what changed."""
-        if not self.changed_fields:
-            return "No specific fields changed"
+        """
+        Get a summary of what changed.
         
-        changes = []
-        for field in self.changed_fields:
-            old_val = self.old_values.get(field, 'N/A') if self.old_values else 'N/A'
-            new_val = self.new_values.get(field, 'N/A') if self.new_values else 'N/A'
-            changes.append(f"{field}: {old_val} → {new_val}")
+        Reads the per-field DataChangeLog rows rather than re-parsing the JSON
+        snapshots; use AuditLog.objects.with_changes() when summarising many logs.
+        """
+        changes = [str(change) for change in self.data_changes.all()]
+        if not changes:
+            return "No specific fields changed"
         
         return "; ".join(changes)
 
@@ -189,7 +232,7 @@ class SystemEvent(models.Model):
         self.is_resolved = True
         self.resolved_at = timezone.now()
         self.resolution_notes = notes
-        self.save()
+        self.save(update_fields=['is_resolved', 'resolved_at', 'resolution_notes'])
 
 
 class ComplianceCheck(models.Model):
@@ -258,7 +301,7 @@ class ComplianceCheck(models.Model):
         self.result_details = result_details
         self.error_message = error_message or ""
         self.warnings = warnings or []
-        self.save()
+        self.save(update_fields=['status', 'completed_at', 'result_details', 'error_message', 'warnings'])
 
 
 class AuditReport(models.Model):
@@ -327,4 +370,5 @@ class AuditReport(models.Model):
         self.is_approved = True
         self.approved_by = user
         self.approved_at = timezone.now()
-        self.save()
+        # Only write the approval columns, not the (possibly large) report_data
+        self.save(update_fields=['is_approved', 'approved_by', 'approved_at'])
@@ -0,0 +1,58 @@
+from rest_framework import serializers
+from django.contrib.contenttypes.models import ContentType
+from .models import AuditLog, DataChangeLog
+
+
+# Columns fetched with .values() for audit log listings
+AUDIT_LOG_LIST_FIELDS = (
+    'id', 'timestamp', 'action', 'user_id', 'user__username',
+    'content_type_id', 'object_id', 'object_repr', 'module', 'ip_address',
+)
+
+
+class AuditLogListSerializer(serializers.Serializer):
+    """
+    Serializer for audit log list rows.
+    
+    Reads the dicts produced by .values(*AUDIT_LOG_LIST_FIELDS) rather than
+    model instances.
+    """
+    id = serializers.IntegerField()
+    timestamp = serializers.DateTimeField()
+    action = serializers.CharField()
+    user_id = serializers.IntegerField(allow_null=True)
+    username = serializers.CharField(source='user__username', allow_null=True)
+    content_type = serializers.SerializerMethodField()
+    object_id = serializers.IntegerField()
+    object_repr = serializers.CharField()
+    module = serializers.CharField()
+    ip_address = serializers.CharField()
+    
+    def get_content_type(self, obj):
+        # get_for_id() is served from ContentType's in-process cache
+        content_type = ContentType.objects.get_for_id(obj['content_type_id'])
+        return f"{content_type.app_label}.{content_type.model}"
+
+
+class DataChangeLogSerializer(serializers.ModelSerializer):
+    """Serializer for DataChangeLog model."""
+    
+    class Meta:
+        model = DataChangeLog
+        fields = ['field_name', 'old_value', 'new_value', 'field_type', 'is_sensitive']
+
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    """Serializer for a single AuditLog with its field changes."""
+    username = serializers.CharField(source='user.username', default=None, read_only=True)
+    data_changes = DataChangeLogSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = AuditLog
+        fields = [
+            'id', 'timestamp', 'action', 'user', 'username', 'session_id', 'ip_address',
+            'user_agent', 'content_type', 'object_id', 'object_repr', 'change_message',
+            'values', 'module', 'function', 'request_path', 'request_method',
+            'is_system_action', 'data_changes'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,23 @@
+from django.contrib.contenttypes.models import ContentType
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from .middleware import AuditTrailMiddleware
+
+
+class AuditTrailMiddlewareTests(TestCase):
+    """Loading content types for the audit buffer."""
+    
+    def setUp(self):
+        ContentType.objects.clear_cache()
+        self.addCleanup(ContentType.objects.clear_cache)
+    
+    def test_loading_waits_for_first_request(self):
+        with self.assertNumQueries(0):
+            middleware = AuditTrailMiddleware(lambda request: HttpResponse())
+        
+        middleware(RequestFactory().get('/'))
+        
+        self.assertTrue(middleware.content_types_loaded)
+        with self.assertNumQueries(0):
+            ContentType.objects.get_for_model(ContentType)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'audit_trail'
+
+urlpatterns = [
+    path('logs/', views.AuditLogListView.as_view(), name='audit-log-list'),
+    path('logs/<int:pk>/', views.AuditLogDetailView.as_view(), name='audit-log-detail'),
+]
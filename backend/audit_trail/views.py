@@ -0,0 +1,30 @@
+from rest_framework import generics, permissions
+
+from .models import AuditLog
+from .serializers import AUDIT_LOG_LIST_FIELDS, AuditLogListSerializer, AuditLogSerializer
+
+
+class CanViewAuditTrail(permissions.BasePermission):
+    """Allow users whose role grants the IPSAS 'audit' permission."""
+    
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.has_ipsas_permission('audit')
+
+
+class AuditLogListView(generics.ListAPIView):
+    """List audit logs."""
+    # Plain dicts instead of model instances; the list only renders a few columns
+    queryset = AuditLog.objects.values(*AUDIT_LOG_LIST_FIELDS)
+    serializer_class = AuditLogListSerializer
+    permission_classes = [CanViewAuditTrail]
+    filterset_fields = ['action', 'user', 'content_type', 'object_id', 'module']
+    search_fields = ['object_repr', 'change_message']
+    ordering_fields = ['timestamp', 'action']
+    ordering = ['-timestamp']
+
+
+class AuditLogDetailView(generics.RetrieveAPIView):
+    """Retrieve an audit log with its field changes."""
+    queryset = AuditLog.objects.select_related('user').with_changes()
+    serializer_class = AuditLogSerializer
+    permission_classes = [CanViewAuditTrail]
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from chart_of_accounts.models import ChartOfAccount
+
+
+class Command(BaseCommand):
+    """
+    Rebuild account balances from opening balances and posted journal lines.
+    
+    Posting keeps current_balance up to date incrementally; this is the
+    repair path after imports, restores or manual corrections.
+    """
+    help = 'Recompute current_balance for accounts from their opening balance and posted journal lines'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'account_numbers',
+            nargs='*',
+            help='Account numbers to rebuild (default: all accounts)'
+        )
+    
+    def handle(self, *args, **options):
+        accounts = ChartOfAccount.objects.all()
+        if options['account_numbers']:
+            accounts = accounts.filter(account_number__in=options['account_numbers'])
+        
+        with transaction.atomic():
+            updated = accounts.recompute_balances()
+        
+        self.stdout.write(self.style.SUCCESS(f"Recomputed balances for {updated} accounts"))
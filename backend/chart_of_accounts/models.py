@@ -1,9 +1,13 @@
 from django.db import models
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Concat
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 
+from core.fields import MoneyField
+
 
 class AccountCategory(models.Model):
     """
@@ -65,7 +69,7 @@ class AccountType(models.Model):
     code = models.CharField(max_length=10)
     description = models.TextField(blank=True)
     normal_balance = models.CharField(
-        max_length=4,
+        max_length=6,
         choices=[('debit', 'Debit'), ('credit', 'Credit')]
     )
     is_active = models.BooleanField(default=True)
@@ -82,6 +86,56 @@ class AccountType(models.Model):
         return f"{self.group.category.code}{self.group.code}{self.code} - {self.name}"
 
 
+class ChartOfAccountQuerySet(models.QuerySet):
+    """QuerySet helpers for chart of accounts."""
+    
+    def recompute_balances(self, account_ids=None):
+        """
+        Recompute current_balance from the opening balance and posted journal lines.
+        
+        Runs as a single UPDATE with a correlated aggregate, so a posting batch
+        touching many accounts costs one round trip. Returns the number of
+        accounts updated.
+        """
+        from journal_entries.models import JournalEntryLine
+        
+        queryset = self if account_ids is None else self.filter(pk__in=account_ids)
+        posted_movement = JournalEntryLine.objects.filter(
+            account=OuterRef('pk'),
+            journal_entry__status='posted'
+        ).order_by().values('account').annotate(
+            movement=Sum(F('debit_amount') - F('credit_amount'))
+        ).values('movement')
+        
+        return queryset.update(
+            current_balance=F('opening_balance') + Coalesce(
+                Subquery(posted_movement),
+                Value(0),
+                output_field=MoneyField()
+            )
+        )
+    
+    def refresh_full_codes(self):
+        """
+        Rebuild the stored full_code from the current category, group and type codes.
+        
+        Run after renumbering a category, group or type; returns the number of
+        accounts updated.
+        """
+        def code_of(model, field):
+            return Subquery(model.objects.filter(pk=OuterRef(field)).values('code')[:1])
+        
+        return self.update(
+            full_code=Concat(
+                code_of(AccountCategory, 'category_id'),
+                code_of(AccountGroup, 'group_id'),
+                code_of(AccountType, 'type_id'),
+                F('account_number'),
+                output_field=models.CharField()
+            )
+        )
+
+
 class ChartOfAccount(models.Model):
     """
     Individual chart of accounts with full account codes and details.
@@ -92,6 +146,9 @@ class ChartOfAccount(models.Model):
         ('suspended', 'Suspended'),
     ]
     
+    # Fields that make up full_code
+    FULL_CODE_FIELDS = frozenset(['category', 'group', 'type', 'account_number'])
+    
     # Account hierarchy
     category = models.ForeignKey(AccountCategory, on_delete=models.CASCADE, related_name='accounts')
     group = models.ForeignKey(AccountGroup, on_delete=models.CASCADE, related_name='accounts')
@@ -99,33 +156,28 @@ class ChartOfAccount(models.Model):
     
     # Account details
     account_number = models.CharField(max_length=20, unique=True)
+    # Category, group and type codes followed by the account number; kept in sync by save()
+    full_code = models.CharField(max_length=50, unique=True, editable=False)
     account_name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     
     # Financial properties
     normal_balance = models.CharField(
-        max_length=4,
+        max_length=6,
         choices=[('debit', 'Debit'), ('credit', 'Credit')]
     )
-    opening_balance = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    current_balance = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
+    # Copy of type.normal_balance so validation doesn't need to load the type
+    type_normal_balance = models.CharField(max_length=6, editable=False)
+    opening_balance = MoneyField(default=Decimal('0.00'))
+    current_balance = MoneyField(default=Decimal('0.00'))
     
     # IPSAS specific fields
     ipsas_category = models.CharField(max_length=100, blank=True)
     zimbabwe_compliance = models.BooleanField(default=True)
     disclosure_required = models.BooleanField(default=False)
     
-    # Account status
+    # Account status; an account is in use unless its status is 'inactive'
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
-    is_active = models.BooleanField(default=True)
     
     # Metadata
     created_by = models.ForeignKey(
@@ -137,6 +189,8 @@ class ChartOfAccount(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ChartOfAccountQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Chart of Account')
         verbose_name_plural = _('Chart of Accounts')
@@ -144,17 +198,30 @@ class ChartOfAccount(models.Model):
         indexes = [
             models.Index(fields=['account_number']),
             models.Index(fields=['category', 'group', 'type']),
-            models.Index(fields=['status', 'is_active']),
+            models.Index(fields=['status']),
         ]
     
     def __str__(self):
         return f"{self.account_number} - {self.account_name}"
     
+    @property
+    def is_active(self):
+        """Whether the account is in use (active or suspended)."""
+        return self.status != 'inactive'
+    
+    @is_active.setter
+    def is_active(self, value):
+        if not value:
+            self.status = 'inactive'
+        elif self.status == 'inactive':
+            self.status = 'active'
+    
     def clean(self):
         """Validate account structure and balances."""
-        if self.normal_balance != self.type.normal_balance:
+        type_normal_balance = self.get_type_normal_balance()
+        if self.normal_balance != type_normal_balance:
             raise ValidationError(
-                f"Account normal balance must match account type normal balance: {self.type.normal_balance}"
+                f"Account normal balance must match account type normal balance: {type_normal_balance}"
             )
         
         if self.opening_balance < 0 and self.normal_balance == 'credit':
@@ -163,9 +230,33 @@ class ChartOfAccount(models.Model):
         if self.opening_balance > 0 and self.normal_balance == 'debit':
             raise ValidationError("Debit accounts cannot have positive opening balances")
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.FULL_CODE_FIELDS.intersection(update_fields):
+            self.full_code = self.build_full_code()
+            self.type_normal_balance = self.type.normal_balance
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'full_code', 'type_normal_balance'}
+        super().save(*args, **kwargs)
+    
+    def get_type_normal_balance(self):
+        """
+        Get the account type's normal balance.
+        
+        Reads the stored copy unless the type object is already loaded (for
+        example, just assigned by a form), so validation doesn't query AccountType.
+        """
+        if ChartOfAccount.type.is_cached(self) or not self.type_normal_balance:
+            return self.type.normal_balance
+        return self.type_normal_balance
+    
+    def build_full_code(self):
+        """Build the complete account code from the related category, group, and type codes."""
+        return f"{self.category.code}{self.group.code}{self.type.code}{self.account_number}"
+    
     def get_full_account_code(self):
         """Get the complete account code combining category, group, and type codes."""
-        return f"{self.category.code}{self.group.code}{self.type.code}{self.account_number}"
+        return self.full_code
     
     def get_balance_display(self):
         """Get formatted balance display."""
@@ -183,6 +274,24 @@ class ChartOfAccount(models.Model):
         return self.category.category_type in ['revenue', 'expenses']
 
 
+class AccountBalanceQuerySet(models.QuerySet):
+    """QuerySet helpers for period balances."""
+    
+    def with_net_movement(self):
+        """Annotate each balance with net_movement (debits less credits) computed in SQL."""
+        return self.annotate(
+            net_movement=ExpressionWrapper(F('total_debits') - F('total_credits'), output_field=MoneyField())
+        )
+    
+    def movement_totals(self):
+        """Get total debits, credits and net movement across the queryset in one query."""
+        return self.aggregate(
+            debits=Coalesce(Sum('total_debits'), Value(0)),
+            credits=Coalesce(Sum('total_credits'), Value(0)),
+            net_movement=Coalesce(Sum(F('total_debits') - F('total_credits'), output_field=MoneyField()), Value(0)),
+        )
+
+
 class AccountBalance(models.Model):
     """
     Track account balances over time for reporting and analysis.
@@ -192,17 +301,19 @@ class AccountBalance(models.Model):
     period_end = models.DateField()
     
     # Balances
-    opening_balance = models.DecimalField(max_digits=15, decimal_places=2)
-    closing_balance = models.DecimalField(max_digits=15, decimal_places=2)
+    opening_balance = MoneyField()
+    closing_balance = MoneyField()
     
     # Movement
-    total_debits = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    total_credits = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    total_debits = MoneyField(default=Decimal('0.00'))
+    total_credits = MoneyField(default=Decimal('0.00'))
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = AccountBalanceQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Account Balance')
         verbose_name_plural = _('Account Balances')
@@ -216,8 +327,15 @@ class AccountBalance(models.Model):
         return f"{self.account.account_number} - {self.period_start} to {self.period_end}"
     
     def get_net_movement(self):
-        """Calculate net movement for the period."""
-        return self.total_debits - self.total_credits
+        """
+        Calculate net movement for the period.
+        
+        Uses the value annotated by AccountBalance.objects.with_net_movement() when present.
+        """
+        try:
+            return self.net_movement
+        except AttributeError:
+            return self.total_debits - self.total_credits
 
 
 class AccountMapping(models.Model):
@@ -0,0 +1,70 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import User
+from journal_entries.models import JournalEntry, JournalEntryLine
+
+from .models import AccountCategory, AccountGroup, AccountType, ChartOfAccount
+
+
+class AccountBalanceUpdateTests(TestCase):
+    """Balance updates applied by posting and full rebuilds."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='poster', password='x', role='admin')
+        category = AccountCategory.objects.create(name='Assets', code='1', category_type='assets')
+        group = AccountGroup.objects.create(category=category, name='Current Assets', code='1')
+        account_type = AccountType.objects.create(group=group, name='Cash', code='1', normal_balance='debit')
+        cls.cash, cls.bank = [
+            ChartOfAccount.objects.create(
+                category=category,
+                group=group,
+                type=account_type,
+                account_number=number,
+                account_name=name,
+                normal_balance='debit',
+                created_by=cls.user,
+            )
+            for number, name in [('001', 'Cash'), ('002', 'Bank')]
+        ]
+    
+    def post_entry(self, amount):
+        entry = JournalEntry.objects.create(
+            entry_date=date(2026, 1, 15),
+            description='Cash deposit',
+            fiscal_year=2026,
+            fiscal_period=1,
+            created_by=self.user,
+        )
+        entry.add_lines([
+            JournalEntryLine(account=self.cash, line_number=1, description='Cash', debit_amount=amount),
+            JournalEntryLine(account=self.bank, line_number=2, description='Bank', credit_amount=amount),
+        ])
+        JournalEntry.objects.filter(pk=entry.pk).update(status='approved')
+        entry.refresh_from_db()
+        entry.post(self.user)
+        return entry
+    
+    def test_post_updates_balances(self):
+        self.post_entry(Decimal('12.34'))
+        
+        self.cash.refresh_from_db()
+        self.bank.refresh_from_db()
+        self.assertEqual(self.cash.current_balance, Decimal('12.34'))
+        self.assertEqual(self.bank.current_balance, Decimal('-12.34'))
+    
+    def test_recompute_balances_command_repairs_balances(self):
+        self.post_entry(Decimal('12.34'))
+        ChartOfAccount.objects.update(current_balance=Decimal('99.00'))
+        
+        call_command('recompute_balances', '001', stdout=StringIO())
+        
+        self.cash.refresh_from_db()
+        self.bank.refresh_from_db()
+        self.assertEqual(self.cash.current_balance, Decimal('12.34'))
+        self.assertEqual(self.bank.current_balance, Decimal('99.00'))
@@ -5,3 +5,9 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Core System & Utilities'
+    
+    def ready(self):
+        import psutil
+        
+        # Prime psutil's CPU sampler so health checks can read it without blocking
+        psutil.cpu_percent(interval=None)
@@ -0,0 +1,84 @@
+"""
+Database helpers shared between apps.
+"""
+import io
+
+from django.db import connection, transaction
+
+
+def _copy_value(value):
+    """Adapt a prepared field value for PostgreSQL's CSV COPY format."""
+    if isinstance(value, (list, tuple)):
+        # Array literal, e.g. {"1100","1200"}
+        items = (
+            'NULL' if item is None
+            else '"%s"' % str(item).replace('\\', '\\\\').replace('"', '\\"')
+            for item in value
+        )
+        return '{%s}' % ','.join(items)
+    return value
+
+
+def _copy_row(values):
+    """
+    Format one line of PostgreSQL CSV COPY data.
+    
+    NULLs are written as unquoted empty fields and everything else is quoted,
+    so empty strings survive. The csv module can't do this: QUOTE_NONNUMERIC
+    quotes None as well.
+    """
+    return ','.join(
+        '' if value is None else '"%s"' % str(value).replace('"', '""')
+        for value in values
+    ) + '\n'
+
+
+def copy_insert(model, objs, ignore_conflicts=False):
+    """
+    Insert unsaved model instances with PostgreSQL COPY.
+    
+    Like bulk_create, this bypasses save() and signals and does not set the
+    instances' primary keys. With ignore_conflicts, rows are COPYed into a
+    temporary staging table and moved into the real table with one
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING. Falls back to bulk_create
+    on other databases. Returns the number of rows inserted; on the fallback
+    with ignore_conflicts this is only an upper bound, as bulk_create can't
+    report which rows were skipped.
+    """
+    if connection.vendor != 'postgresql':
+        return len(model.objects.bulk_create(objs, ignore_conflicts=ignore_conflicts))
+    
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    table = connection.ops.quote_name(model._meta.db_table)
+    
+    buffer = io.StringIO()
+    count = 0
+    for obj in objs:
+        buffer.write(_copy_row([
+            _copy_value(field.get_db_prep_save(field.pre_save(obj, add=True), connection))
+            for field in fields
+        ]))
+        count += 1
+    buffer.seek(0)
+    
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not ignore_conflicts:
+            cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+            return count
+        
+        # Dropped explicitly rather than ON COMMIT: inside an outer
+        # transaction that commit is only the outermost one, and a second
+        # call would find the table still there
+        cursor.execute(
+            f'CREATE TEMP TABLE copy_staging AS '
+            f'SELECT {columns} FROM {table} WITH NO DATA'
+        )
+        cursor.copy_expert(f'COPY copy_staging ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) SELECT {columns} FROM copy_staging '
+            f'ON CONFLICT DO NOTHING'
+        )
+        inserted = cursor.rowcount
+        cursor.execute('DROP TABLE copy_staging')
+        return inserted
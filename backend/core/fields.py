@@ -0,0 +1,49 @@
+"""
+Model fields shared across the IPSAS apps.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django import forms
+from django.core import exceptions
+from django.db import models
+
+CENT = Decimal('0.01')
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Monetary amount stored as a whole number of cents in a BIGINT column.
+    
+    Python code still sees Decimal values with two decimal places, while
+    sums and F() arithmetic run on native 64-bit integers in the database.
+    """
+    description = 'Monetary amount stored as integer cents'
+    
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return Decimal(value).scaleb(-2)
+    
+    def to_python(self, value):
+        if value is None:
+            return value
+        try:
+            return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+        except (InvalidOperation, ValueError):
+            raise exceptions.ValidationError(
+                self.error_messages['invalid'],
+                code='invalid',
+                params={'value': value},
+            )
+    
+    def get_prep_value(self, value):
+        if value is None:
+            return value
+        return int(self.to_python(value).scaleb(2))
+    
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{
+            'form_class': forms.DecimalField,
+            'decimal_places': 2,
+            **kwargs,
+        })
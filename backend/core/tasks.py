@@ -0,0 +1,185 @@
+"""
+Background tasks for data export and import.
+
+Exports stream rows from the database in chunks and write them straight to
+a temporary file, so worker memory stays flat regardless of dataset size.
+"""
+import csv
+import io
+import tempfile
+from decimal import Decimal, InvalidOperation
+
+from celery import shared_task
+from django.core.files import File
+from django.core.files.storage import default_storage
+from openpyxl import Workbook
+
+from .db import copy_insert
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 5000
+
+EXPORT_FORMATS = {
+    'csv': 'csv',
+    'excel': 'xlsx',
+}
+
+CHART_OF_ACCOUNTS_EXPORT_FIELDS = (
+    'account_number',
+    'full_code',
+    'account_name',
+    'category__code',
+    'group__code',
+    'type__code',
+    'normal_balance',
+    'opening_balance',
+    'current_balance',
+    'ipsas_category',
+    'status',
+)
+
+# Filters clients may pass through to the export queryset
+CHART_OF_ACCOUNTS_EXPORT_FILTERS = ('status', 'category', 'group', 'type', 'normal_balance')
+
+# Columns an import file must provide; normal_balance, opening_balance,
+# description and ipsas_category are optional
+CHART_OF_ACCOUNTS_IMPORT_REQUIRED_FIELDS = (
+    'account_number',
+    'account_name',
+    'category_code',
+    'group_code',
+    'type_code',
+)
+
+
+def chart_of_accounts_export_rows(filters):
+    """Stream chart of accounts rows as tuples in export column order."""
+    from chart_of_accounts.models import ChartOfAccount
+    
+    queryset = ChartOfAccount.objects.filter(**filters).order_by('account_number')
+    return queryset.values_list(*CHART_OF_ACCOUNTS_EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _write_csv(rows, header, file_obj):
+    writer = csv.writer(file_obj)
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _write_excel(rows, header, file_obj):
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append(header)
+    count = 0
+    for row in rows:
+        worksheet.append(row)
+        count += 1
+    workbook.save(file_obj)
+    return count
+
+
+@shared_task(bind=True)
+def export_chart_of_accounts(self, filters, export_format):
+    """Export the chart of accounts to default storage; returns the stored file path."""
+    extension = EXPORT_FORMATS[export_format]
+    rows = chart_of_accounts_export_rows(filters)
+    
+    with tempfile.TemporaryFile() as tmp:
+        if export_format == 'csv':
+            text = io.TextIOWrapper(tmp, encoding='utf-8', newline='')
+            row_count = _write_csv(rows, CHART_OF_ACCOUNTS_EXPORT_FIELDS, text)
+            text.flush()
+            text.detach()
+        else:
+            row_count = _write_excel(rows, CHART_OF_ACCOUNTS_EXPORT_FIELDS, tmp)
+        
+        tmp.seek(0)
+        path = default_storage.save(f'exports/chart_of_accounts_{self.request.id}.{extension}', File(tmp))
+    
+    return {'file': path, 'records': row_count}
+
+
+@shared_task
+def import_chart_of_accounts(path, user_id=None):
+    """
+    Import chart of accounts rows from an uploaded CSV in default storage.
+    
+    Rows are read as a stream, validated, and loaded in batches with COPY;
+    account numbers that already exist are skipped.
+    """
+    from chart_of_accounts.models import AccountGroup, AccountType, ChartOfAccount
+    
+    groups = {
+        (group.category.code, group.code): group
+        for group in AccountGroup.objects.select_related('category')
+    }
+    types = {
+        (account_type.group.category.code, account_type.group.code, account_type.code): account_type
+        for account_type in AccountType.objects.select_related('group__category')
+    }
+    
+    created = 0
+    errors = []
+    batch = []
+    
+    with default_storage.open(path, 'rb') as raw:
+        reader = csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8-sig', newline=''))
+        missing = [f for f in CHART_OF_ACCOUNTS_IMPORT_REQUIRED_FIELDS if f not in (reader.fieldnames or [])]
+        if missing:
+            return {'records_processed': 0, 'errors': [{'line': 1, 'error': f"Missing columns: {', '.join(missing)}"}]}
+        
+        for line_number, row in enumerate(reader, start=2):
+            if not row.get('account_number') or not row.get('account_name'):
+                errors.append({'line': line_number, 'error': 'Account number and name are required'})
+                continue
+            
+            key = (row.get('category_code'), row.get('group_code'))
+            group = groups.get(key)
+            account_type = types.get(key + (row.get('type_code'),))
+            if group is None or account_type is None:
+                errors.append({'line': line_number, 'error': 'Unknown category, group or type code'})
+                continue
+            
+            normal_balance = row.get('normal_balance') or account_type.normal_balance
+            if normal_balance != account_type.normal_balance:
+                errors.append({
+                    'line': line_number,
+                    'error': f'Normal balance must match account type normal balance: {account_type.normal_balance}'
+                })
+                continue
+            
+            try:
+                opening_balance = Decimal(row.get('opening_balance') or '0.00')
+            except InvalidOperation:
+                errors.append({'line': line_number, 'error': 'Invalid opening balance'})
+                continue
+            
+            # COPY bypasses save(), so build full_code here from the known codes
+            batch.append(ChartOfAccount(
+                category=group.category,
+                group=group,
+                type=account_type,
+                account_number=row['account_number'],
+                full_code=f"{key[0]}{key[1]}{account_type.code}{row['account_number']}",
+                account_name=row['account_name'],
+                normal_balance=normal_balance,
+                type_normal_balance=account_type.normal_balance,
+                opening_balance=opening_balance,
+                current_balance=opening_balance,
+                # DictReader fills missing trailing columns with None
+                description=row.get('description') or '',
+                ipsas_category=row.get('ipsas_category') or '',
+                created_by_id=user_id,
+            ))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                created += copy_insert(ChartOfAccount, batch, ignore_conflicts=True)
+                batch = []
+    
+    if batch:
+        created += copy_insert(ChartOfAccount, batch, ignore_conflicts=True)
+    
+    return {'records_processed': created, 'errors': errors}
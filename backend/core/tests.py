@@ -0,0 +1,182 @@
+import tempfile
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from chart_of_accounts.models import AccountCategory, AccountGroup, AccountType, ChartOfAccount
+
+from . import views
+from .db import copy_insert
+from .fields import MoneyField
+from .tasks import import_chart_of_accounts
+
+
+class MoneyFieldTests(SimpleTestCase):
+    """Converting MoneyField values without the database."""
+    
+    def test_get_prep_value_converts_to_cents(self):
+        self.assertEqual(MoneyField().get_prep_value(Decimal('12.34')), 1234)
+        self.assertEqual(MoneyField().get_prep_value('-0.5'), -50)
+        self.assertIsNone(MoneyField().get_prep_value(None))
+    
+    def test_to_python_rounds_half_up_to_cents(self):
+        self.assertEqual(MoneyField().to_python('12.345'), Decimal('12.35'))
+        self.assertEqual(MoneyField().to_python(7), Decimal('7.00'))
+    
+    def test_to_python_rejects_non_numbers(self):
+        with self.assertRaises(ValidationError):
+            MoneyField().to_python('twelve')
+
+
+class MoneyFieldStorageTests(TestCase):
+    """MoneyField values stored as BIGINT cents."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        category = AccountCategory.objects.create(name='Assets', code='1', category_type='assets')
+        group = AccountGroup.objects.create(category=category, name='Current Assets', code='1')
+        account_type = AccountType.objects.create(group=group, name='Cash', code='1', normal_balance='debit')
+        cls.account = ChartOfAccount.objects.create(
+            category=category,
+            group=group,
+            type=account_type,
+            account_number='001',
+            account_name='Cash',
+            normal_balance='debit',
+            opening_balance=Decimal('12.34'),
+        )
+    
+    def test_round_trip(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT opening_balance FROM {ChartOfAccount._meta.db_table} WHERE id = %s',
+                [self.account.pk],
+            )
+            self.assertEqual(cursor.fetchone()[0], 1234)
+        
+        opening_balance = ChartOfAccount.objects.values_list('opening_balance', flat=True).get(pk=self.account.pk)
+        self.assertEqual(opening_balance, Decimal('12.34'))
+        self.assertEqual(str(opening_balance), '12.34')
+    
+    def test_filter_by_decimal(self):
+        self.assertTrue(ChartOfAccount.objects.filter(opening_balance=Decimal('12.34')).exists())
+
+
+class CopyInsertTests(TestCase):
+    """Loading rows with copy_insert()."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='loader', password='x')
+        cls.category = AccountCategory.objects.create(name='Assets', code='1', category_type='assets')
+        cls.group = AccountGroup.objects.create(category=cls.category, name='Current Assets', code='1')
+        cls.type = AccountType.objects.create(group=cls.group, name='Cash', code='1', normal_balance='debit')
+    
+    def account(self, number):
+        return ChartOfAccount(
+            category=self.category,
+            group=self.group,
+            type=self.type,
+            account_number=number,
+            full_code=f'111{number}',
+            account_name=f'Account {number}',
+            normal_balance='debit',
+            type_normal_balance='debit',
+            created_by=self.user,
+        )
+    
+    def test_ignore_conflicts_twice_in_one_transaction(self):
+        with transaction.atomic():
+            first = copy_insert(ChartOfAccount, [self.account('001')], ignore_conflicts=True)
+            second = copy_insert(ChartOfAccount, [self.account('001'), self.account('002')], ignore_conflicts=True)
+        
+        self.assertEqual((first, second), (1, 1))
+        self.assertEqual(ChartOfAccount.objects.count(), 2)
+    
+    def test_nulls_and_empty_strings(self):
+        account = self.account('001')
+        account.created_by = None
+        account.description = ''
+        
+        copy_insert(ChartOfAccount, [account])
+        
+        saved = ChartOfAccount.objects.get(account_number='001')
+        self.assertIsNone(saved.created_by_id)
+        self.assertEqual(saved.description, '')
+
+
+class ChartOfAccountsImportTests(TestCase):
+    """Importing the chart of accounts from CSV."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        category = AccountCategory.objects.create(name='Assets', code='1', category_type='assets')
+        group = AccountGroup.objects.create(category=category, name='Current Assets', code='1')
+        AccountType.objects.create(group=group, name='Cash', code='1', normal_balance='debit')
+    
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+    
+    def test_short_rows_import_with_blank_optional_columns(self):
+        path = default_storage.save('imports/accounts.csv', ContentFile(
+            'account_number,account_name,category_code,group_code,type_code,description,ipsas_category\n'
+            '001,Petty Cash,1,1,1\n'
+            '002\n'
+        ))
+        
+        result = import_chart_of_accounts(path)
+        
+        self.assertEqual(result['records_processed'], 1)
+        self.assertEqual([error['line'] for error in result['errors']], [3])
+        account = ChartOfAccount.objects.get(account_number='001')
+        self.assertEqual((account.description, account.ipsas_category), ('', ''))
+
+
+class HealthCheckTests(TestCase):
+    """The system health check endpoint."""
+    
+    def test_reports_database_connected(self):
+        request = APIRequestFactory().get('/api/core/health/')
+        force_authenticate(request, user=User.objects.create_user(username='monitor', password='x'))
+        response = views.health_check(request)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['database'], 'connected')
+
+
+class TaskStatusTests(TestCase):
+    """Access to background task results."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='x')
+        cls.other = User.objects.create_user(username='other', password='x')
+    
+    def setUp(self):
+        cache.set(views._task_owner_key('task-1'), self.owner.pk)
+        self.addCleanup(cache.delete, views._task_owner_key('task-1'))
+    
+    def get_status(self, user, task_id='task-1'):
+        request = APIRequestFactory().get(f'/api/tasks/{task_id}/')
+        force_authenticate(request, user=user)
+        return views.task_status(request, task_id=task_id)
+    
+    def test_owner_can_read_task(self):
+        self.assertEqual(self.get_status(self.owner).status_code, 200)
+    
+    def test_other_user_cannot_read_task(self):
+        self.assertEqual(self.get_status(self.other).status_code, 404)
+    
+    def test_unknown_task_is_not_found(self):
+        self.assertEqual(self.get_status(self.owner, task_id='task-2').status_code, 404)
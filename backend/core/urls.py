@@ -9,4 +9,5 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('export/', views.export_data, name='export-data'),
     path('import/', views.import_data, name='import-data'),
+    path('tasks/<str:task_id>/', views.task_status, name='task-status'),
 ]
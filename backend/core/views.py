@@ -3,10 +3,77 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import connection
+from django.db.models import Count, Q
+from django.db.models.functions import Substr
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
 from django.utils import timezone
+from functools import lru_cache
 import psutil
 import os
+import socket
+
+SYSTEM_METRICS_CACHE_TIMEOUT = 5  # seconds
+DASHBOARD_COUNTS_CACHE_TIMEOUT = 30  # seconds
+TASK_OWNER_CACHE_TIMEOUT = 24 * 60 * 60  # seconds, matching Celery's default result expiry
+
+
+def _task_owner_key(task_id):
+    return f'core:task_owner:{task_id}'
+
+
+def _get_system_metrics():
+    """
+    Get CPU, memory and disk usage, shared between concurrent health probes.
+    
+    CPU usage is measured against the previous sample (primed in
+    CoreConfig.ready()) so the call never sleeps.
+    """
+    cache_key = f'core:system_metrics:{socket.gethostname()}'
+    metrics = cache.get(cache_key)
+    if metrics is None:
+        metrics = {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': psutil.virtual_memory().percent,
+            'disk_percent': psutil.disk_usage(settings.HEALTH_DISK_PATH).percent,
+        }
+        cache.set(cache_key, metrics, SYSTEM_METRICS_CACHE_TIMEOUT)
+    return metrics
+
+
+def _get_dashboard_counts():
+    """
+    Get account, journal entry and statement counts for the dashboard.
+    
+    The counts are the same for every user, so one set of aggregate queries
+    is shared through the cache for a short period.
+    """
+    from chart_of_accounts.models import ChartOfAccount
+    from journal_entries.models import JournalEntry
+    from financial_statements.models import FinancialStatement
+    
+    cache_key = 'core:dashboard_counts'
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = {
+            # One aggregate query per model
+            'accounts': ChartOfAccount.objects.aggregate(
+                total=Count('pk', filter=~Q(status='inactive')),
+                active=Count('pk', filter=Q(status='active')),
+            ),
+            'journal_entries': JournalEntry.objects.aggregate(
+                total=Count('pk'),
+                posted=Count('pk', filter=Q(status='posted')),
+                pending=Count('pk', filter=Q(status='pending')),
+            ),
+            'financial_statements': FinancialStatement.objects.aggregate(
+                total=Count('pk'),
+                published=Count('pk', filter=Q(status='published')),
+            ),
+        }
+        cache.set(cache_key, counts, DASHBOARD_COUNTS_CACHE_TIMEOUT)
+    return counts
 
 
 @api_view(['GET'])
@@ -17,20 +84,11 @@ def health_check(request):
         with connection.cursor() as cursor:
             cursor.execute("SELECT 1")
         
-        # Check system resources
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
         health_status = {
             'status': 'healthy',
             'timestamp': timezone.now().isoformat(),
             'database': 'connected',
-            'system': {
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory.percent,
-                'disk_percent': disk.percent,
-            }
+            'system': _get_system_metrics(),
         }
         
         return Response(health_status)
@@ -47,7 +105,13 @@ def health_check(request):
 @permission_classes([IsAuthenticated])
 def system_info(request):
     """Get system information and configuration."""
-    system_info = {
+    return Response(dict(_system_info_payload()))
+
+
+@lru_cache(maxsize=1)
+def _system_info_payload():
+    """Build the system information payload; settings don't change while the process runs."""
+    return {
         'django_version': '4.2.7',
         'python_version': '3.8+',
         'database': settings.DATABASES['default']['ENGINE'],
@@ -59,66 +123,46 @@ def system_info(request):
         'debug_mode': settings.DEBUG,
         'timezone': str(settings.TIME_ZONE),
     }
-    
-    return Response(system_info)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard(request):
     """Get dashboard summary data."""
-    from chart_of_accounts.models import ChartOfAccount
     from journal_entries.models import JournalEntry
     from financial_statements.models import FinancialStatement
     
     try:
-        # Get account counts
-        total_accounts = ChartOfAccount.objects.filter(is_active=True).count()
-        active_accounts = ChartOfAccount.objects.filter(status='active', is_active=True).count()
-        
-        # Get journal entry counts
-        total_entries = JournalEntry.objects.count()
-        posted_entries = JournalEntry.objects.filter(status='posted').count()
-        pending_entries = JournalEntry.objects.filter(status='pending').count()
+        counts = _get_dashboard_counts()
         
-        # Get financial statement counts
-        total_statements = FinancialStatement.objects.count()
-        published_statements = FinancialStatement.objects.filter(status='published').count()
-        
-        # Get recent activity
-        recent_entries = JournalEntry.objects.order_by('-created_at')[:5]
-        recent_statements = FinancialStatement.objects.order_by('-created_at')[:5]
+        # Get recent activity as plain rows; descriptions are truncated by the database
+        recent_entries = JournalEntry.objects.annotate(
+            short_description=Substr('description', 1, 50)
+        ).order_by('-created_at').values(
+            'entry_number', 'short_description', 'status', 'created_at'
+        )[:5]
+        recent_statements = FinancialStatement.objects.order_by('-created_at').values(
+            'statement_code', 'statement_name', 'status', 'created_at'
+        )[:5]
         
         dashboard_data = {
-            'accounts': {
-                'total': total_accounts,
-                'active': active_accounts,
-            },
-            'journal_entries': {
-                'total': total_entries,
-                'posted': posted_entries,
-                'pending': pending_entries,
-            },
-            'financial_statements': {
-                'total': total_statements,
-                'published': published_statements,
-            },
+            **counts,
             'recent_activity': {
                 'journal_entries': [
                     {
-                        'entry_number': entry.entry_number,
-                        'description': entry.description[:50],
-                        'status': entry.status,
-                        'created_at': entry.created_at.isoformat(),
+                        'entry_number': entry['entry_number'],
+                        'description': entry['short_description'],
+                        'status': entry['status'],
+                        'created_at': entry['created_at'].isoformat(),
                     }
                     for entry in recent_entries
                 ],
                 'financial_statements': [
                     {
-                        'statement_code': stmt.statement_code,
-                        'statement_name': stmt.statement_name,
-                        'status': stmt.status,
-                        'created_at': stmt.created_at.isoformat(),
+                        'statement_code': stmt['statement_code'],
+                        'statement_name': stmt['statement_name'],
+                        'status': stmt['status'],
+                        'created_at': stmt['created_at'].isoformat(),
                     }
                     for stmt in recent_statements
                 ]
@@ -137,25 +181,46 @@ def dashboard(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def export_data(request):
-    """Export data in various formats."""
+    """
+    Export data in various formats.
+    
+    The export runs as a Celery task; poll the task-status endpoint with the
+    returned export_id to get the generated file.
+    """
+    from .tasks import EXPORT_FORMATS, CHART_OF_ACCOUNTS_EXPORT_FILTERS, export_chart_of_accounts
+    
     export_type = request.data.get('type', 'excel')
     data_type = request.data.get('data_type', 'chart_of_accounts')
     filters = request.data.get('filters', {})
     
-    # TODO: Implement data export logic
-    # This would include Excel, PDF, CSV export functionality
+    if data_type != 'chart_of_accounts':
+        return Response({
+            'error': f'Export of {data_type} is not supported'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if export_type not in EXPORT_FORMATS:
+        return Response({
+            'error': f'Unsupported export format: {export_type}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Only pass whitelisted lookups through to the queryset
+    filters = {key: value for key, value in filters.items() if key in CHART_OF_ACCOUNTS_EXPORT_FILTERS}
+    task = export_chart_of_accounts.delay(filters, export_type)
+    cache.set(_task_owner_key(task.id), request.user.pk, TASK_OWNER_CACHE_TIMEOUT)
     
     return Response({
         'message': f'Export of {data_type} in {export_type} format initiated',
-        'export_id': 'EXP001',  # Placeholder
+        'export_id': task.id,
         'status': 'processing'
-    })
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def import_data(request):
     """Import data from external sources."""
+    from .tasks import import_chart_of_accounts
+    
     import_type = request.data.get('type', 'chart_of_accounts')
     source_system = request.data.get('source_system', 'manual')
     file_data = request.FILES.get('file')
@@ -165,12 +230,44 @@ def import_data(request):
             'error': 'No file provided for import'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # TODO: Implement data import logic
-    # This would include validation, mapping, and import functionality
+    if import_type != 'chart_of_accounts':
+        return Response({
+            'error': f'Import of {import_type} is not supported'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Hand the stored upload to a worker instead of parsing it on the request thread
+    path = default_storage.save(f'imports/{import_type}/{file_data.name}', file_data)
+    task = import_chart_of_accounts.delay(path, request.user.pk)
+    cache.set(_task_owner_key(task.id), request.user.pk, TASK_OWNER_CACHE_TIMEOUT)
     
     return Response({
         'message': f'Import of {import_type} from {source_system} initiated',
-        'import_id': 'IMP001',  # Placeholder
+        'import_id': task.id,
         'status': 'processing',
         'records_processed': 0
-    })
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_status(request, task_id):
+    """Get the status and result of a background export or import started by the requesting user."""
+    from celery.result import AsyncResult
+    
+    # Unknown, expired and other users' tasks all look the same
+    if cache.get(_task_owner_key(task_id)) != request.user.pk:
+        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    result = AsyncResult(task_id)
+    data = {
+        'task_id': task_id,
+        'status': result.status.lower(),
+    }
+    if result.successful():
+        data['result'] = result.result
+        if 'file' in result.result:
+            data['result']['url'] = default_storage.url(result.result['file'])
+    elif result.failed():
+        data['error'] = str(result.result)
+    
+    return Response(data)
@@ -1,7 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class FinancialStatementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'financial_statements'
     verbose_name = 'Financial Statements & IPSAS Reporting'
+    
+    def ready(self):
+        from .triggers import install_timestamp_triggers
+        
+        post_migrate.connect(install_timestamp_triggers, sender=self)
@@ -1,10 +1,37 @@
-from django.db import models
-from django.core.validators import MinValueValidator
+from django.db import models, transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Concat, Substr
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from decimal import Decimal
+from functools import lru_cache
 import uuid
 
+from core.db import copy_insert
+from core.fields import MoneyField
+
+# Rows per INSERT/UPDATE statement when materializing statement data in bulk
+BULK_BATCH_SIZE = 1000
+
+
+def _choices_display(field_name, choices):
+    """
+    Build a get_<field>_display() method backed by a label dict built once.
+    
+    Django's generated version rebuilds that dict from the field's choices on every call.
+    """
+    labels = dict(choices)
+    
+    def get_display(self):
+        value = getattr(self, field_name)
+        return labels.get(value, value)
+    
+    return get_display
+
 
 class FinancialPeriod(models.Model):
     """
@@ -24,13 +51,15 @@ class FinancialPeriod(models.Model):
     
     name = models.CharField(max_length=100)
     fiscal_year = models.IntegerField()
-    period_number = models.IntegerField(validators=[MinValueValidator(1), MinValueValidator(12)])
+    period_number = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(12)])
     period_type = models.CharField(max_length=20, choices=PERIOD_TYPES, default='monthly')
     
     start_date = models.DateField()
     end_date = models.DateField()
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    get_period_type_display = _choices_display('period_type', PERIOD_TYPES)
+    get_status_display = _choices_display('status', STATUS_CHOICES)
     
     # Period control
     is_adjustment_period = models.BooleanField(default=False)
@@ -43,7 +72,7 @@ class FinancialPeriod(models.Model):
         null=True,
         related_name='created_periods'
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -61,6 +90,55 @@ class FinancialPeriod(models.Model):
             raise ValidationError("Start date must be before end date")
 
 
+class FinancialStatementQuerySet(models.QuerySet):
+    """QuerySet helpers for financial statements."""
+    
+    def with_details(self):
+        """Load each statement's one-to-one type-specific details in the same query."""
+        return self.select_related(*FinancialStatement.DETAIL_RELATIONS.values())
+    
+    def list_fields(self):
+        """
+        Load only the columns a statement listing shows, joining just the period.
+        
+        Replaces the manager's default select_related, since the workflow
+        users aren't needed.
+        """
+        return self.select_related(None).select_related('financial_period').only(
+            *FinancialStatement.LIST_FIELDS
+        )
+    
+    def with_lines(self):
+        """Prefetch each statement's lines in display order."""
+        return self.prefetch_related(
+            models.Prefetch('lines', queryset=StatementLine.objects.order_by('sort_order', 'line_number'))
+        )
+    
+    def delete(self):
+        """
+        Delete the statements, removing their lines with one set-based DELETE.
+        
+        Django's collector would otherwise load every line into memory, because
+        the parent_line self-reference stops it from fast-deleting them. Line
+        delete signals are not sent.
+        """
+        with transaction.atomic(using=self.db):
+            StatementLine.objects.filter(statement__in=self.values('pk'))._raw_delete(self.db)
+            return super().delete()
+    
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class FinancialStatementManager(models.Manager.from_queryset(FinancialStatementQuerySet)):
+    """Default manager that joins the period and workflow users rendered with every statement."""
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'financial_period', 'generated_by', 'reviewed_by', 'approved_by'
+        )
+
+
 class FinancialStatement(models.Model):
     """
     Base model for all financial statements.
@@ -86,6 +164,26 @@ class FinancialStatement(models.Model):
         ('archived', 'Archived'),
     ]
     
+    # Columns loaded by FinancialStatement.objects.list_fields()
+    LIST_FIELDS = [
+        'id',
+        'statement_type',
+        'statement_name',
+        'statement_code',
+        'status',
+        'version',
+        'financial_period__name',
+        'financial_period__fiscal_year',
+        'financial_period__period_number',
+    ]
+    
+    # Statement types with a one-to-one details model, and its related name
+    DETAIL_RELATIONS = {
+        'sfp': 'sfp_details',
+        'sfp_performance': 'sfp_performance_details',
+        'scf': 'scf_details',
+    }
+    
     # Statement identification
     statement_type = models.CharField(max_length=50, choices=STATEMENT_TYPES)
     statement_name = models.CharField(max_length=200)
@@ -100,6 +198,8 @@ class FinancialStatement(models.Model):
     
     # Status and approval
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    get_statement_type_display = _choices_display('statement_type', STATEMENT_TYPES)
+    get_status_display = _choices_display('status', STATUS_CHOICES)
     version = models.PositiveIntegerField(default=1)
     
     # Generation details
@@ -132,18 +232,76 @@ class FinancialStatement(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     
     # Metadata
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = FinancialStatementManager()
+    
     class Meta:
         verbose_name = _('Financial Statement')
         verbose_name_plural = _('Financial Statements')
-        unique_together = ['statement_type', 'financial_period', 'version']
         ordering = ['-financial_period__fiscal_year', '-financial_period__period_number', 'statement_type']
+        constraints = [
+            # Archived versions drop out of the index, keeping it small as history grows
+            models.UniqueConstraint(
+                fields=['statement_type', 'financial_period', 'version'],
+                condition=~Q(status='archived'),
+                name='unique_active_statement_version'
+            ),
+        ]
+        indexes = [
+            # Per-period listings, ordered by type (the unique constraint leads with statement_type)
+            models.Index(fields=['financial_period', 'statement_type'], name='fs_period_type_idx'),
+            models.Index(fields=['status']),
+        ]
     
     def __str__(self):
         return f"{self.statement_name} - {self.financial_period} (v{self.version})"
     
+    def get_details(self):
+        """
+        Get the type-specific details for this statement, or None.
+        
+        Free of queries when loaded through FinancialStatement.objects.with_details().
+        """
+        relation = self.DETAIL_RELATIONS.get(self.statement_type)
+        if relation is None:
+            return None
+        try:
+            return getattr(self, relation)
+        except ObjectDoesNotExist:
+            return None
+    
+    def compute_totals(self):
+        """Sum the amounts of the statement's detail lines in one aggregate query."""
+        return self.lines.filter(line_type='detail').aggregate(**{
+            field: Coalesce(Sum(field), Value(0))
+            for field in StatementLine.AMOUNT_FIELDS
+        })
+    
+    def compute_subtotals(self):
+        """
+        Sum detail line amounts per parent line in one grouped query.
+        
+        Returns a dict mapping parent_line_id (None for top-level lines) to
+        a dict of amount totals.
+        """
+        rows = self.lines.filter(line_type='detail').order_by().values('parent_line_id').annotate(**{
+            field + '_total': Sum(field) for field in StatementLine.AMOUNT_FIELDS
+        })
+        return {
+            row['parent_line_id']: {
+                field: row[field + '_total'] for field in StatementLine.AMOUNT_FIELDS
+            }
+            for row in rows
+        }
+    
+    def delete(self, *args, **kwargs):
+        """Delete the statement; its lines are removed with one set-based DELETE."""
+        with transaction.atomic():
+            StatementLine.objects.filter(statement_id=self.pk)._raw_delete(StatementLine.objects.db)
+            return super().delete(*args, **kwargs)
+    
     def save(self, *args, **kwargs):
         """Auto-generate statement code if not provided."""
         if not self.statement_code:
@@ -151,10 +309,20 @@ class FinancialStatement(models.Model):
         super().save(*args, **kwargs)
     
     def _generate_statement_code(self):
-        """Generate unique statement code."""
+        """
+        Generate unique statement code.
+        
+        Uses the financial period if it is already loaded (for example via
+        select_related('financial_period')); otherwise fetches only its year
+        and period number.
+        """
         prefix = self.statement_type.upper()[:3]
-        year = self.financial_period.fiscal_year
-        period = self.financial_period.period_number
+        if FinancialStatement.financial_period.is_cached(self):
+            year, period = self.financial_period.fiscal_year, self.financial_period.period_number
+        else:
+            year, period = FinancialPeriod.objects.filter(pk=self.financial_period_id).values_list(
+                'fiscal_year', 'period_number'
+            ).get()
         return f"{prefix}{year}{period:02d}{self.version:02d}"
 
 
@@ -170,10 +338,12 @@ class StatementLine(models.Model):
         ('calculation', 'Calculation'),
     ]
     
+    # No standalone index: the composite indexes below all lead with statement
     statement = models.ForeignKey(
         FinancialStatement,
         on_delete=models.CASCADE,
-        related_name='lines'
+        related_name='lines',
+        db_index=False
     )
     
     # Line structure
@@ -185,28 +355,20 @@ class StatementLine(models.Model):
         blank=True,
         related_name='child_lines'
     )
+    # Materialized path of zero-padded line numbers from the root line, e.g.
+    # "00010/00012"; lets a whole subtree load with one prefix query
+    path = models.CharField(max_length=255, editable=False, default='')
     
     # Line content
     line_type = models.CharField(max_length=20, choices=LINE_TYPES, default='detail')
+    get_line_type_display = _choices_display('line_type', LINE_TYPES)
     description = models.CharField(max_length=500)
-    account_codes = models.TextField(blank=True)  # Comma-separated account codes
+    account_codes = ArrayField(models.CharField(max_length=50), default=list, blank=True)
     
     # Financial amounts
-    current_period_amount = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    previous_period_amount = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    budget_amount = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
+    current_period_amount = MoneyField(default=Decimal('0.00'))
+    previous_period_amount = MoneyField(default=Decimal('0.00'))
+    budget_amount = MoneyField(default=Decimal('0.00'))
     
     # Display properties
     is_bold = models.BooleanField(default=False)
@@ -215,7 +377,7 @@ class StatementLine(models.Model):
     sort_order = models.PositiveIntegerField(default=0)
     
     # Metadata
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -223,9 +385,105 @@ class StatementLine(models.Model):
         verbose_name_plural = _('Statement Lines')
         ordering = ['statement', 'sort_order', 'line_number']
         unique_together = ['statement', 'line_number']
+        indexes = [
+            models.Index(fields=['statement', 'sort_order', 'line_number']),
+            # Prefix (LIKE 'path/%') lookups for subtrees
+            models.Index(
+                F('statement'),
+                OpClass('path', name='varchar_pattern_ops'),
+                name='sl_statement_path_idx'
+            ),
+            # Supports account_codes__contains / __overlap lookups
+            GinIndex(fields=['account_codes'], name='sl_account_codes_gin'),
+        ]
     
     def __str__(self):
         return f"{self.statement.statement_code} - Line {self.line_number}: {self.description}"
+    
+    AMOUNT_FIELDS = ['current_period_amount', 'previous_period_amount', 'budget_amount']
+    
+    # Fields that make up path
+    PATH_FIELDS = frozenset(['parent_line', 'line_number'])
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        old_path = self.path
+        if update_fields is None or self.PATH_FIELDS.intersection(update_fields):
+            self.path = self.build_path()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'path'}
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Re-root the subtree if this line moved or was renumbered
+            if old_path and old_path != self.path:
+                StatementLine.objects.filter(
+                    statement_id=self.statement_id,
+                    path__startswith=f"{old_path}/"
+                ).update(path=Concat(Value(self.path), Substr('path', len(old_path) + 1)))
+    
+    def build_path(self):
+        """Build this line's materialized path from its parent's path and its line number."""
+        segment = f"{self.line_number:05d}"
+        if self.parent_line_id is None:
+            return segment
+        return f"{self.parent_line.path}/{segment}"
+    
+    def get_descendants(self):
+        """Get all lines below this one, at any depth, in a single query."""
+        return StatementLine.objects.filter(statement_id=self.statement_id, path__startswith=f"{self.path}/")
+    
+    def get_subtree_totals(self):
+        """Sum the amounts of all descendant lines in one aggregate query."""
+        return self.get_descendants().aggregate(**{
+            field: Coalesce(Sum(field), Value(0))
+            for field in self.AMOUNT_FIELDS
+        })
+    
+    @classmethod
+    def bulk_materialize(cls, statement, rows):
+        """
+        Create the lines for a statement from an iterable of field dicts.
+        
+        Inserts in batches inside one transaction. parent_line values must
+        refer to lines that are already saved.
+        """
+        lines = [cls(statement=statement, **row) for row in rows]
+        # bulk_create bypasses save(), so fill in the materialized paths here
+        for line in lines:
+            line.path = line.build_path()
+        with transaction.atomic():
+            return cls.objects.bulk_create(lines, batch_size=BULK_BATCH_SIZE)
+    
+    @classmethod
+    def copy_from(cls, statement, rows):
+        """
+        Load lines for a statement from an iterable of field dicts with COPY.
+        
+        A faster alternative to bulk_materialize() for very large loads. The
+        created lines are not returned, and parent_line values must refer to
+        lines that are already saved. Returns the number of lines loaded.
+        """
+        lines = []
+        for row in rows:
+            line = cls(statement=statement, **row)
+            line.path = line.build_path()
+            lines.append(line)
+        return copy_insert(cls, lines)
+    
+    @classmethod
+    def bulk_update_amounts(cls, lines, fields=None):
+        """Write recalculated amounts for many lines in batched UPDATEs."""
+        with transaction.atomic():
+            return cls.objects.bulk_update(lines, fields or cls.AMOUNT_FIELDS, batch_size=BULK_BATCH_SIZE)
+
+
+class StatementOfFinancialPositionQuerySet(models.QuerySet):
+    """QuerySet helpers for statements of financial position."""
+    
+    def recalculate(self):
+        """Recalculate working capital for every row in one UPDATE; see calculate_working_capital()."""
+        return self.update(working_capital=F('current_assets') - F('current_liabilities'))
 
 
 class StatementOfFinancialPosition(models.Model):
@@ -243,19 +501,21 @@ class StatementOfFinancialPosition(models.Model):
     comparative_date = models.DateField()
     
     # Key metrics
-    total_assets = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    total_liabilities = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    total_equity = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    total_assets = MoneyField(default=Decimal('0.00'))
+    total_liabilities = MoneyField(default=Decimal('0.00'))
+    total_equity = MoneyField(default=Decimal('0.00'))
     
     # Working capital
-    current_assets = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    current_liabilities = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    working_capital = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    current_assets = MoneyField(default=Decimal('0.00'))
+    current_liabilities = MoneyField(default=Decimal('0.00'))
+    working_capital = MoneyField(default=Decimal('0.00'))
     
     # Metadata
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = StatementOfFinancialPositionQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Statement of Financial Position')
         verbose_name_plural = _('Statements of Financial Position')
@@ -269,6 +529,22 @@ class StatementOfFinancialPosition(models.Model):
         return self.working_capital
 
 
+class StatementOfFinancialPerformanceQuerySet(models.QuerySet):
+    """QuerySet helpers for statements of financial performance."""
+    
+    def recalculate(self):
+        """
+        Recalculate net surplus/deficit and budget variances for every row in one UPDATE.
+        
+        Equivalent to calculate_net_surplus_deficit() and calculate_variances().
+        """
+        return self.update(
+            net_surplus_deficit=F('total_revenue') - F('total_expenses'),
+            revenue_variance=F('total_revenue') - F('budgeted_revenue'),
+            expense_variance=F('total_expenses') - F('budgeted_expenses'),
+        )
+
+
 class StatementOfFinancialPerformance(models.Model):
     """
     Statement of Financial Performance (Income Statement) specific model.
@@ -286,23 +562,25 @@ class StatementOfFinancialPerformance(models.Model):
     comparative_period_end = models.DateField()
     
     # Key metrics
-    total_revenue = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    total_expenses = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    net_surplus_deficit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    total_revenue = MoneyField(default=Decimal('0.00'))
+    total_expenses = MoneyField(default=Decimal('0.00'))
+    net_surplus_deficit = MoneyField(default=Decimal('0.00'))
     
     # Budget comparison
-    budgeted_revenue = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    budgeted_expenses = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    budgeted_surplus_deficit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    budgeted_revenue = MoneyField(default=Decimal('0.00'))
+    budgeted_expenses = MoneyField(default=Decimal('0.00'))
+    budgeted_surplus_deficit = MoneyField(default=Decimal('0.00'))
     
     # Variances
-    revenue_variance = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    expense_variance = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    revenue_variance = MoneyField(default=Decimal('0.00'))
+    expense_variance = MoneyField(default=Decimal('0.00'))
     
     # Metadata
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = StatementOfFinancialPerformanceQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Statement of Financial Performance')
         verbose_name_plural = _('Statements of Financial Performance')
@@ -322,6 +600,29 @@ class StatementOfFinancialPerformance(models.Model):
         return self.revenue_variance, self.expense_variance
 
 
+class StatementOfCashFlowsQuerySet(models.QuerySet):
+    """QuerySet helpers for statements of cash flows."""
+    
+    def recalculate(self):
+        """
+        Recalculate net cash flows for every row in one UPDATE; see calculate_net_cash_flows().
+        
+        The totals are spelled out from the source columns because an UPDATE
+        reads the pre-update row values.
+        """
+        net_operations = F('cash_from_operations') - F('cash_used_in_operations')
+        net_investing = F('cash_from_investing') - F('cash_used_in_investing')
+        net_financing = F('cash_from_financing') - F('cash_used_in_financing')
+        net_change = net_operations + net_investing + net_financing
+        return self.update(
+            net_cash_from_operations=net_operations,
+            net_cash_from_investing=net_investing,
+            net_cash_from_financing=net_financing,
+            net_change_in_cash=net_change,
+            cash_at_end=F('cash_at_beginning') + net_change,
+        )
+
+
 class StatementOfCashFlows(models.Model):
     """
     Statement of Cash Flows specific model.
@@ -337,29 +638,31 @@ class StatementOfCashFlows(models.Model):
     reporting_period_end = models.DateField()
     
     # Operating activities
-    cash_from_operations = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    cash_used_in_operations = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    net_cash_from_operations = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    cash_from_operations = MoneyField(default=Decimal('0.00'))
+    cash_used_in_operations = MoneyField(default=Decimal('0.00'))
+    net_cash_from_operations = MoneyField(default=Decimal('0.00'))
     
     # Investing activities
-    cash_from_investing = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    cash_used_in_investing = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    net_cash_from_investing = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    cash_from_investing = MoneyField(default=Decimal('0.00'))
+    cash_used_in_investing = MoneyField(default=Decimal('0.00'))
+    net_cash_from_investing = MoneyField(default=Decimal('0.00'))
     
     # Financing activities
-    cash_from_financing = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    cash_used_in_financing = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    net_cash_from_financing = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    cash_from_financing = MoneyField(default=Decimal('0.00'))
+    cash_used_in_financing = MoneyField(default=Decimal('0.00'))
+    net_cash_from_financing = MoneyField(default=Decimal('0.00'))
     
     # Net change and ending balance
-    net_change_in_cash = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    cash_at_beginning = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    cash_at_end = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    net_change_in_cash = MoneyField(default=Decimal('0.00'))
+    cash_at_beginning = MoneyField(default=Decimal('0.00'))
+    cash_at_end = MoneyField(default=Decimal('0.00'))
     
     # Metadata
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = StatementOfCashFlowsQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Statement of Cash Flows')
         verbose_name_plural = _('Statements of Cash Flows')
@@ -384,6 +687,37 @@ class StatementOfCashFlows(models.Model):
         return self.net_change_in_cash
 
 
+class PropertyPlantEquipmentQuerySet(models.QuerySet):
+    """QuerySet helpers for PPE schedules."""
+    
+    def recalculate(self):
+        """
+        Recalculate closing cost, depreciation and carrying amounts for every row in one UPDATE.
+        
+        Equivalent to calculate_carrying_amounts(); derived totals are spelled
+        out from the source columns because an UPDATE reads the pre-update values.
+        """
+        cost_at_end = (
+            F('cost_at_beginning') +
+            F('additions') -
+            F('disposals') +
+            F('revaluations') +
+            F('transfers')
+        )
+        accumulated_depreciation_end = (
+            F('accumulated_depreciation_beginning') +
+            F('depreciation_expense') -
+            F('accumulated_depreciation_disposals') +
+            F('accumulated_depreciation_revaluations')
+        )
+        return self.update(
+            cost_at_end=cost_at_end,
+            accumulated_depreciation_end=accumulated_depreciation_end,
+            carrying_amount_beginning=F('cost_at_beginning') - F('accumulated_depreciation_beginning'),
+            carrying_amount_end=cost_at_end - accumulated_depreciation_end,
+        )
+
+
 class PropertyPlantEquipment(models.Model):
     """
     Property, Plant & Equipment Schedule for IPSAS compliance.
@@ -399,56 +733,30 @@ class PropertyPlantEquipment(models.Model):
     asset_subcategory = models.CharField(max_length=100, blank=True)
     
     # Cost information
-    cost_at_beginning = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    additions = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    disposals = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    revaluations = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    transfers = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    cost_at_end = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    cost_at_beginning = MoneyField(default=Decimal('0.00'))
+    additions = MoneyField(default=Decimal('0.00'))
+    disposals = MoneyField(default=Decimal('0.00'))
+    revaluations = MoneyField(default=Decimal('0.00'))
+    transfers = MoneyField(default=Decimal('0.00'))
+    cost_at_end = MoneyField(default=Decimal('0.00'))
     
     # Accumulated depreciation
-    accumulated_depreciation_beginning = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    depreciation_expense = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    accumulated_depreciation_disposals = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    accumulated_depreciation_revaluations = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    accumulated_depreciation_end = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
+    accumulated_depreciation_beginning = MoneyField(default=Decimal('0.00'))
+    depreciation_expense = MoneyField(default=Decimal('0.00'))
+    accumulated_depreciation_disposals = MoneyField(default=Decimal('0.00'))
+    accumulated_depreciation_revaluations = MoneyField(default=Decimal('0.00'))
+    accumulated_depreciation_end = MoneyField(default=Decimal('0.00'))
     
     # Carrying amounts
-    carrying_amount_beginning = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    carrying_amount_end = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
+    carrying_amount_beginning = MoneyField(default=Decimal('0.00'))
+    carrying_amount_end = MoneyField(default=Decimal('0.00'))
     
     # Metadata
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PropertyPlantEquipmentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Property, Plant & Equipment')
         verbose_name_plural = _('Property, Plant & Equipment')
@@ -457,6 +765,32 @@ class PropertyPlantEquipment(models.Model):
     def __str__(self):
         return f"{self.asset_category} - {self.asset_subcategory or 'General'}"
     
+    @classmethod
+    def recalculate_all(cls, statement_id):
+        """
+        Recalculate every row of a statement's PPE schedule.
+        
+        Runs as a single UPDATE, so no rows are loaded into Python however
+        large the asset register is. Returns the number of rows updated.
+        """
+        return cls.objects.filter(statement_id=statement_id).recalculate()
+    
+    @classmethod
+    def bulk_create_schedule(cls, statement, rows):
+        """
+        Create a statement's PPE schedule from an iterable of field dicts.
+        
+        Closing and carrying amounts are calculated before the batched insert,
+        so no follow-up save is needed.
+        """
+        assets = []
+        for row in rows:
+            asset = cls(statement=statement, **row)
+            asset.calculate_carrying_amounts()
+            assets.append(asset)
+        with transaction.atomic():
+            return cls.objects.bulk_create(assets, batch_size=BULK_BATCH_SIZE)
+    
     def calculate_carrying_amounts(self):
         """Calculate carrying amounts."""
         self.cost_at_end = (
@@ -480,12 +814,39 @@ class PropertyPlantEquipment(models.Model):
         return self.carrying_amount_end
 
 
+@lru_cache(maxsize=128)
+def _load_template_structure(template_id, updated_at):
+    """
+    Load a template's structure; updated_at is part of the cache key, so
+    an edited template is read again on first use.
+    """
+    return FinancialStatementTemplate.objects.values_list(
+        'template_structure', flat=True
+    ).get(pk=template_id)
+
+
+@lru_cache(maxsize=128)
+def _compile_template_account_codes(template_id, updated_at):
+    """Collect every account code referenced anywhere in a template's structure."""
+    codes = set()
+    pending = [_load_template_structure(template_id, updated_at)]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            codes.update(node.get('account_codes') or ())
+            pending.extend(value for key, value in node.items() if key != 'account_codes')
+        elif isinstance(node, list):
+            pending.extend(node)
+    return frozenset(codes)
+
+
 class FinancialStatementTemplate(models.Model):
     """
     Templates for generating financial statements.
     """
     template_name = models.CharField(max_length=200)
     statement_type = models.CharField(max_length=50, choices=FinancialStatement.STATEMENT_TYPES)
+    get_statement_type_display = _choices_display('statement_type', FinancialStatement.STATEMENT_TYPES)
     description = models.TextField(blank=True)
     
     # Template structure (JSON field for flexibility)
@@ -506,7 +867,7 @@ class FinancialStatementTemplate(models.Model):
         null=True,
         related_name='created_templates'
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -516,3 +877,16 @@ class FinancialStatementTemplate(models.Model):
     
     def __str__(self):
         return f"{self.template_name} - {self.get_statement_type_display()}"
+    
+    def get_structure(self):
+        """
+        Get the template structure from the in-process cache.
+        
+        The returned structure is shared between callers and must not be
+        modified.
+        """
+        return _load_template_structure(self.pk, self.updated_at)
+    
+    def get_account_codes(self):
+        """Get the account codes the template's lines draw on, as a frozenset."""
+        return _compile_template_account_codes(self.pk, self.updated_at)
@@ -0,0 +1,36 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.test import TestCase
+
+from .models import FinancialPeriod
+
+
+class UpdatedAtTriggerTests(TestCase):
+    """updated_at stamped by the database trigger."""
+    
+    def setUp(self):
+        self.period = FinancialPeriod.objects.create(
+            name='January 2026',
+            fiscal_year=2026,
+            period_number=1,
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 1, 31),
+        )
+        self.stale = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+    
+    def stored_updated_at(self):
+        return FinancialPeriod.objects.values_list('updated_at', flat=True).get(pk=self.period.pk)
+    
+    def test_save_stamps_updated_at_without_reloading(self):
+        self.period.updated_at = self.stale
+        
+        with self.assertNumQueries(1):
+            self.period.save()
+        
+        self.assertNotEqual(self.period.updated_at, self.stale)
+        self.assertNotEqual(self.stored_updated_at(), self.stale)
+    
+    def test_queryset_update_stamps_updated_at(self):
+        FinancialPeriod.objects.filter(pk=self.period.pk).update(updated_at=self.stale)
+        
+        self.assertNotEqual(self.stored_updated_at(), self.stale)
@@ -0,0 +1,45 @@
+"""
+Database-side timestamp maintenance for financial statement tables.
+
+created_at and updated_at get DEFAULT now(), and a BEFORE UPDATE trigger
+stamps updated_at, so queryset.update() and bulk_update() keep it current
+without Django sending the column. save() still stamps it in Python through
+auto_now, so the instance isn't left stale and needs no re-read; the stored
+value is the trigger's, which may differ by the time since the transaction
+began.
+"""
+from django.db import connections
+
+UPDATED_AT_FUNCTION = """
+CREATE OR REPLACE FUNCTION ipsas_set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def install_timestamp_triggers(sender, using='default', **kwargs):
+    """post_migrate handler: install timestamp defaults and triggers for the app's tables."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    
+    with connection.cursor() as cursor:
+        cursor.execute(UPDATED_AT_FUNCTION)
+        for model in sender.get_models():
+            field_names = {field.name for field in model._meta.concrete_fields}
+            if not {'created_at', 'updated_at'} <= field_names:
+                continue
+            table = connection.ops.quote_name(model._meta.db_table)
+            cursor.execute(
+                f"ALTER TABLE {table} "
+                f"ALTER COLUMN created_at SET DEFAULT now(), "
+                f"ALTER COLUMN updated_at SET DEFAULT now()"
+            )
+            cursor.execute(f"DROP TRIGGER IF EXISTS set_updated_at ON {table}")
+            cursor.execute(
+                f"CREATE TRIGGER set_updated_at BEFORE UPDATE ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION ipsas_set_updated_at()"
+            )
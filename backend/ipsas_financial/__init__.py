@@ -1 +1,4 @@
 # IPSAS Financial Software Django Project
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -0,0 +1,12 @@
+"""
+Celery application for IPSAS Financial Software project.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ipsas_financial.settings')
+
+app = Celery('ipsas_financial')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     
     # Third party apps
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     'django_filters',
     'django_extensions',
@@ -88,6 +89,11 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Keep connections open between requests instead of reconnecting each time
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # Set when connecting through PgBouncer in transaction pooling mode
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
     }
 }
 
@@ -123,6 +129,12 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Let Django serve media and static files itself (development only; production
+# serves static files through WhiteNoise and media from nginx or object storage)
+SERVE_MEDIA = config('SERVE_MEDIA', default=DEBUG, cast=bool)
+
+# Filesystem reported by the health check (override for containers with a read-only rootfs)
+HEALTH_DISK_PATH = config('HEALTH_DISK_PATH', default='/')
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -208,3 +220,6 @@ IPSAS_VERSION = '2022'
 ZIMBABWE_COMPLIANCE = True
 FINANCIAL_YEAR_START = 'JANUARY'
 FINANCIAL_YEAR_END = 'DECEMBER'
+
+# Audit trail retention, enforced by the purge_audit_logs command
+AUDIT_LOG_RETENTION_DAYS = config('AUDIT_LOG_RETENTION_DAYS', default=2555, cast=int)
@@ -6,17 +6,26 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core import urls as core_urls
+from accounts import urls as accounts_urls
+from chart_of_accounts import urls as chart_of_accounts_urls
+from journal_entries import urls as journal_entries_urls
+from financial_statements import urls as financial_statements_urls
+from reports import urls as reports_urls
+from audit_trail import urls as audit_trail_urls
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include('core.urls')),
-    path('api/accounts/', include('accounts.urls')),
-    path('api/chart-of-accounts/', include('chart_of_accounts.urls')),
-    path('api/journal-entries/', include('journal_entries.urls')),
-    path('api/financial-statements/', include('financial_statements.urls')),
-    path('api/reports/', include('reports.urls')),
-    path('api/audit-trail/', include('audit_trail.urls')),
+    path('api/', include(core_urls)),
+    path('api/accounts/', include(accounts_urls)),
+    path('api/chart-of-accounts/', include(chart_of_accounts_urls)),
+    path('api/journal-entries/', include(journal_entries_urls)),
+    path('api/financial-statements/', include(financial_statements_urls)),
+    path('api/reports/', include(reports_urls)),
+    path('api/audit-trail/', include(audit_trail_urls)),
 ]
 
-if settings.DEBUG:
+# static() only works with DEBUG on; skip building the patterns entirely otherwise
+if settings.DEBUG and settings.SERVE_MEDIA:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -5,7 +5,12 @@ WSGI config for IPSAS Financial Software project.
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ipsas_financial.settings')
 
 application = get_wsgi_application()
+
+# Build the URL tree at startup rather than on each worker's first request;
+# with gunicorn --preload the workers then share it copy-on-write
+get_resolver().url_patterns
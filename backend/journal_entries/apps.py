@@ -1,7 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class JournalEntriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'journal_entries'
     verbose_name = 'Journal Entries & Transactions'
+    
+    def ready(self):
+        from .triggers import install_totals_triggers
+        
+        post_migrate.connect(install_totals_triggers, sender=self)
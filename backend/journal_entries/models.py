@@ -1,12 +1,67 @@
 from django.db import models
-from django.core.validators import MinValueValidator
+from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from datetime import date
 from decimal import Decimal
-import uuid
+import re
+from django.core.cache import cache
 from django.utils import timezone
 
+from core.fields import MoneyField
+
+# Roles allowed to take an entry through each workflow step
+APPROVE_ROLES = frozenset({'admin', 'manager'})
+POST_ROLES = frozenset({'admin', 'accountant'})
+
+# JE<year><month><sequence>, e.g. JE2026010042
+ENTRY_NUMBER_RE = re.compile(r'^JE(\d{4})(\d{2})(\d{4})$')
+
+ENTRY_CACHE_TIMEOUT = 300  # seconds
+TRIAL_BALANCE_BATCH_SIZE = 2000
+
+# Descriptive fields served from the cache by JournalEntry.objects.get_cached()
+CACHED_ENTRY_FIELDS = (
+    'id',
+    'entry_number',
+    'entry_date',
+    'reference_number',
+    'description',
+    'entry_type',
+    'fiscal_year',
+    'fiscal_period',
+)
+
+
+def _entry_cache_key(pk):
+    return f'journal_entries:entry:{pk}'
+
+
+class JournalEntryQuerySet(models.QuerySet):
+    """QuerySet helpers for journal entries."""
+    
+    def get_cached(self, pk):
+        """
+        Get an entry's descriptive fields as a dict, read through the cache.
+        
+        Workflow columns (status, approvals, totals) change outside save(),
+        so they are deliberately left out. Raises DoesNotExist if there is
+        no such entry.
+        """
+        cache_key = _entry_cache_key(pk)
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.values(*CACHED_ENTRY_FIELDS).get(pk=pk)
+            cache.set(cache_key, data, ENTRY_CACHE_TIMEOUT)
+        return data
+    
+    def workflow_fields(self):
+        """Load only the columns can_approve() and can_post() need."""
+        return self.only('id', 'status', 'created_by_id')
+
 
 class JournalEntry(models.Model):
     """
@@ -42,11 +97,12 @@ class JournalEntry(models.Model):
     
     # Financial period
     fiscal_year = models.IntegerField()
-    fiscal_period = models.IntegerField(validators=[MinValueValidator(1), MinValueValidator(12)])
+    fiscal_period = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(12)])
     
-    # Amounts
-    total_debits = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    total_credits = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    # Amounts (maintained from the lines by database triggers, see triggers.py)
+    total_debits = MoneyField(default=Decimal('0.00'), editable=False)
+    total_credits = MoneyField(default=Decimal('0.00'), editable=False)
+    TOTAL_FIELDS = frozenset({'total_debits', 'total_credits'})
     
     # Audit fields
     created_by = models.ForeignKey(
@@ -80,14 +136,30 @@ class JournalEntry(models.Model):
     batch_id = models.CharField(max_length=50, blank=True)
     notes = models.TextField(blank=True)
     
+    objects = JournalEntryQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Journal Entry')
         verbose_name_plural = _('Journal Entries')
         ordering = ['-entry_date', '-created_at']
+        constraints = [
+            # Drafts may be unbalanced while their lines are being entered
+            models.CheckConstraint(
+                check=Q(status='draft') | Q(total_debits=F('total_credits')),
+                name='je_balanced'
+            ),
+            models.CheckConstraint(check=Q(fiscal_period__gte=1, fiscal_period__lte=12), name='je_period_range'),
+        ]
         indexes = [
             models.Index(fields=['entry_date', 'fiscal_year', 'fiscal_period']),
             models.Index(fields=['status', 'entry_type']),
             models.Index(fields=['created_by', 'status']),
+            # Trial balance and reporting scans only ever read posted entries
+            models.Index(
+                fields=['fiscal_year', 'fiscal_period'],
+                condition=Q(status='posted'),
+                name='je_posted_period_idx'
+            ),
         ]
     
     def __str__(self):
@@ -95,38 +167,46 @@ class JournalEntry(models.Model):
     
     def clean(self):
         """Validate journal entry."""
-        if self.total_debits != self.total_credits:
+        if self.status != 'draft' and self.total_debits != self.total_credits:
             raise ValidationError("Total debits must equal total credits")
         
         if self.fiscal_period < 1 or self.fiscal_period > 12:
             raise ValidationError("Fiscal period must be between 1 and 12")
     
-    def save(self, *args, **kwargs):
-        """Override save to auto-generate entry number if not provided."""
-        if not self.entry_number:
-            self.entry_number = self._generate_entry_number()
-        super().save(*args, **kwargs)
-    
-    def _generate_entry_number(self):
-        """Generate unique entry number."""
-        import datetime
-        today = datetime.date.today()
-        prefix = f"JE{today.year}{today.month:02d}"
+    def save(self, *args, today=None, **kwargs):
+        """
+        Override save to auto-generate entry number if not provided.
         
-        # Get the last entry number for today
-        last_entry = JournalEntry.objects.filter(
-            entry_number__startswith=prefix
-        ).order_by('-entry_number').first()
+        Batch callers may pass today, taken once, to number every new entry
+        without re-reading the date. Updates never write total_debits and
+        total_credits, which the line triggers maintain and this instance may
+        hold stale copies of.
+        """
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.TOTAL_FIELDS
+            ]
         
-        if last_entry:
-            try:
-                last_number = int(last_entry.entry_number[-4:])
-                new_number = last_number + 1
-            except ValueError:
-                new_number = 1
+        if self.entry_number:
+            super().save(*args, **kwargs)
         else:
-            new_number = 1
-        
+            # Allocate the number in the same transaction as the insert, so a
+            # failed save doesn't consume it
+            with transaction.atomic():
+                self.entry_number = self._generate_entry_number(today)
+                super().save(*args, **kwargs)
+        cache.delete(_entry_cache_key(self.pk))
+    
+    def delete(self, *args, **kwargs):
+        cache.delete(_entry_cache_key(self.pk))
+        return super().delete(*args, **kwargs)
+    
+    def _generate_entry_number(self, today=None):
+        """Generate unique entry number for the month of today, defaulting to the current date."""
+        today = today or date.today()
+        prefix = f"JE{today.year}{today.month:02d}"
+        new_number = JournalEntryCounter.next_value(today.year, today.month, prefix)
         return f"{prefix}{new_number:04d}"
     
     def get_balance(self):
@@ -135,49 +215,91 @@ class JournalEntry(models.Model):
     
     def can_approve(self, user):
         """Check if user can approve this entry."""
-        if self.status != 'pending':
-            return False
-        
-        if user.role in ['admin', 'manager']:
-            return True
-        
-        return False
+        return self.status == 'pending' and user.role in APPROVE_ROLES
     
     def can_post(self, user):
         """Check if user can post this entry."""
-        if self.status != 'approved':
-            return False
-        
-        if user.role in ['admin', 'accountant']:
-            return True
-        
-        return False
+        return self.status == 'approved' and user.role in POST_ROLES
     
-    def approve(self, user):
-        """Approve the journal entry."""
+    def approve(self, user, now=None):
+        """
+        Approve the journal entry.
+        
+        Batch callers may pass now, taken once, to stamp every entry alike.
+        """
         if not self.can_approve(user):
             raise ValidationError("User cannot approve this entry")
         
-        self.status = 'approved'
-        self.approved_by = user
-        self.approved_at = timezone.now()
-        self.save()
+        now = now or timezone.now()
+        self._transition('pending', status='approved', approved_by=user, approved_at=now, updated_at=now)
     
-    def post(self, user):
-        """Post the journal entry to accounts."""
+    def post(self, user, now=None):
+        """
+        Post the journal entry to accounts.
+        
+        Batch callers may pass now, taken once, to stamp every entry alike.
+        """
         if not self.can_post(user):
             raise ValidationError("User cannot post this entry")
         
+        from chart_of_accounts.models import ChartOfAccount
+        
         with transaction.atomic():
-            # Update account balances
-            for line in self.lines.all():
-                line.account.current_balance += line.debit_amount - line.credit_amount
-                line.account.save()
+            now = now or timezone.now()
+            self._transition('approved', status='posted', posted_by=user, posted_at=now, updated_at=now)
             
-            self.status = 'posted'
-            self.posted_by = user
-            self.posted_at = timezone.now()
-            self.save()
+            # Lock the affected accounts in primary key order, so entries
+            # posting to overlapping accounts queue up instead of deadlocking
+            list(
+                ChartOfAccount.objects.select_for_update().filter(pk__in=self.lines.values('account_id'))
+                .order_by('pk').values_list('pk', flat=True)
+            )
+            self._apply_to_balances()
+    
+    def _transition(self, from_status, **changes):
+        """
+        Write a workflow change with one UPDATE of just the changed columns.
+        
+        The UPDATE only matches while the entry is still in from_status, so
+        two users approving or posting the same entry can't both succeed.
+        """
+        updated = JournalEntry.objects.filter(pk=self.pk, status=from_status).update(**changes)
+        if not updated:
+            raise ValidationError("Entry was changed by another user; reload and try again")
+        for field_name, value in changes.items():
+            setattr(self, field_name, value)
+    
+    def add_lines(self, lines):
+        """Insert unsaved lines for this entry in batched multi-row INSERTs."""
+        for line in lines:
+            line.journal_entry = self
+        return JournalEntryLine.objects.bulk_create(lines, batch_size=500)
+    
+    def _apply_to_balances(self):
+        """
+        Add this entry's net movement per account to the account balances.
+        
+        The lines are netted and applied by one UPDATE ... FROM, so the
+        arithmetic runs in PostgreSQL and no amounts pass through Python.
+        Accounts whose lines cancel out are left untouched.
+        """
+        from chart_of_accounts.models import ChartOfAccount
+        
+        quote_name = connection.ops.quote_name
+        accounts = quote_name(ChartOfAccount._meta.db_table)
+        lines = quote_name(JournalEntryLine._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {accounts} SET current_balance = {accounts}.current_balance + movement.amount '
+                f'FROM ('
+                f'SELECT account_id, SUM(debit_amount - credit_amount) AS amount FROM {lines} '
+                f'WHERE journal_entry_id = %s GROUP BY account_id '
+                f'HAVING SUM(debit_amount - credit_amount) <> 0'
+                f') AS movement '
+                f'WHERE {accounts}.id = movement.account_id',
+                [self.pk]
+            )
+            return cursor.rowcount
     
     def reverse(self, user):
         """Create a reversing entry."""
@@ -188,6 +310,65 @@ class JournalEntry(models.Model):
         pass
 
 
+class JournalEntryCounter(models.Model):
+    """
+    Last entry number issued for each month.
+    
+    Incremented with a single atomic upsert, so concurrent saves never
+    compute the same entry number.
+    """
+    year = models.IntegerField()
+    month = models.IntegerField()
+    counter = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = _('Journal Entry Counter')
+        verbose_name_plural = _('Journal Entry Counters')
+        unique_together = ['year', 'month']
+    
+    def __str__(self):
+        return f"{self.year}-{self.month:02d}: {self.counter}"
+    
+    @classmethod
+    def next_value(cls, year, month, prefix):
+        """
+        Increment and return the counter for a month.
+        
+        The row lock taken by the update is held until the caller's
+        transaction ends. A month's first call seeds the counter from any
+        entries already numbered with prefix.
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET counter = counter + 1 WHERE year = %s AND month = %s RETURNING counter',
+                [year, month]
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
+            
+            last_entry_number = JournalEntry.objects.filter(
+                entry_number__startswith=prefix
+            ).order_by('-entry_number').values_list('entry_number', flat=True).first()
+            match = ENTRY_NUMBER_RE.match(last_entry_number) if last_entry_number else None
+            start = int(match.group(3)) + 1 if match else 1
+            cursor.execute(
+                f'INSERT INTO {table} (year, month, counter) VALUES (%s, %s, %s) '
+                f'ON CONFLICT (year, month) DO UPDATE SET counter = {table}.counter + 1 '
+                f'RETURNING counter',
+                [year, month, start]
+            )
+            return cursor.fetchone()[0]
+
+
+class JournalEntryLineManager(models.Manager):
+    """Default manager that joins the entry and account rendered with every line."""
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('journal_entry', 'account')
+
+
 class JournalEntryLine(models.Model):
     """
     Individual line items within a journal entry.
@@ -208,16 +389,8 @@ class JournalEntryLine(models.Model):
     description = models.CharField(max_length=200)
     
     # Amounts
-    debit_amount = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
-    credit_amount = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
-        default=Decimal('0.00')
-    )
+    debit_amount = MoneyField(default=Decimal('0.00'))
+    credit_amount = MoneyField(default=Decimal('0.00'))
     
     # Additional fields
     project_code = models.CharField(max_length=50, blank=True)
@@ -228,13 +401,26 @@ class JournalEntryLine(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = JournalEntryLineManager()
+    
     class Meta:
         verbose_name = _('Journal Entry Line')
         verbose_name_plural = _('Journal Entry Lines')
         ordering = ['journal_entry', 'line_number']
         unique_together = ['journal_entry', 'line_number']
+        constraints = [
+            models.CheckConstraint(check=Q(debit_amount__gte=0, credit_amount__gte=0), name='jel_nonneg'),
+            models.CheckConstraint(check=~Q(debit_amount__gt=0, credit_amount__gt=0), name='jel_xor'),
+            models.CheckConstraint(check=Q(debit_amount__gt=0) | Q(credit_amount__gt=0), name='jel_nonzero'),
+        ]
         indexes = [
             models.Index(fields=['account', 'journal_entry']),
+            # Covers the per-account netting in JournalEntry.post()
+            models.Index(
+                fields=['journal_entry', 'account'],
+                include=['debit_amount', 'credit_amount'],
+                name='jel_entry_account_cover'
+            ),
         ]
     
     def __str__(self):
@@ -259,6 +445,13 @@ class JournalEntryLine(models.Model):
             return -self.credit_amount
 
 
+class JournalEntryAttachmentManager(models.Manager):
+    """Default manager that joins the entry and uploader shown in attachment listings."""
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('journal_entry', 'uploaded_by')
+
+
 class JournalEntryAttachment(models.Model):
     """
     Attachments for journal entries (receipts, invoices, etc.).
@@ -282,6 +475,8 @@ class JournalEntryAttachment(models.Model):
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
+    objects = JournalEntryAttachmentManager()
+    
     class Meta:
         verbose_name = _('Journal Entry Attachment')
         verbose_name_plural = _('Journal Entry Attachments')
@@ -332,12 +527,12 @@ class TrialBalance(models.Model):
     Trial balance for a specific period.
     """
     fiscal_year = models.IntegerField()
-    fiscal_period = models.IntegerField(validators=[MinValueValidator(1), MinValueValidator(12)])
+    fiscal_period = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(12)])
     as_of_date = models.DateField()
     
     # Balances
-    total_debits = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    total_credits = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    total_debits = MoneyField(default=Decimal('0.00'))
+    total_credits = MoneyField(default=Decimal('0.00'))
     
     # Status
     is_balanced = models.BooleanField(default=False)
@@ -362,11 +557,129 @@ class TrialBalance(models.Model):
     def __str__(self):
         return f"Trial Balance - {self.fiscal_year} Period {self.fiscal_period}"
     
+    @classmethod
+    def generate(cls, fiscal_year, fiscal_period, user=None, as_of_date=None):
+        """
+        Build (or rebuild) the trial balance for a period from posted entries.
+        
+        Opening and period movements for every account are summed by the
+        database in one grouped query and streamed back in chunks; the old
+        lines are removed with one DELETE and the new ones inserted in
+        batches, all in one transaction.
+        """
+        from chart_of_accounts.models import ChartOfAccount
+        
+        posted = Q(journal_lines__journal_entry__status='posted')
+        before_period = (
+            Q(journal_lines__journal_entry__fiscal_year__lt=fiscal_year) |
+            Q(journal_lines__journal_entry__fiscal_year=fiscal_year,
+              journal_lines__journal_entry__fiscal_period__lt=fiscal_period)
+        )
+        in_period = Q(
+            journal_lines__journal_entry__fiscal_year=fiscal_year,
+            journal_lines__journal_entry__fiscal_period=fiscal_period
+        )
+        zero = Value(0)
+        rows = ChartOfAccount.objects.order_by().annotate(
+            prior_movement=Coalesce(
+                Sum(
+                    F('journal_lines__debit_amount') - F('journal_lines__credit_amount'),
+                    filter=posted & before_period,
+                    output_field=MoneyField()
+                ),
+                zero
+            ),
+            period_debit=Coalesce(Sum('journal_lines__debit_amount', filter=posted & in_period), zero),
+            period_credit=Coalesce(Sum('journal_lines__credit_amount', filter=posted & in_period), zero),
+        ).values_list('pk', 'opening_balance', 'prior_movement', 'period_debit', 'period_credit')
+        
+        with transaction.atomic():
+            trial_balance, _ = cls.objects.select_for_update().get_or_create(
+                fiscal_year=fiscal_year,
+                fiscal_period=fiscal_period,
+                defaults={'as_of_date': as_of_date or date.today(), 'created_by': user}
+            )
+            if trial_balance.is_closed:
+                raise ValidationError("Closed trial balances cannot be regenerated")
+            
+            # Replace the previous lines wholesale; one DELETE also clears lines
+            # for accounts that no longer have any activity
+            trial_balance.lines.all().delete()
+            
+            # Stream the accounts and write lines batch by batch, so memory
+            # use doesn't grow with the size of the chart
+            total_debits = total_credits = Decimal('0.00')
+            batch = []
+            for account_id, opening_balance, prior_movement, period_debit, period_credit in rows.iterator(
+                chunk_size=TRIAL_BALANCE_BATCH_SIZE
+            ):
+                opening = opening_balance + prior_movement
+                closing = opening + period_debit - period_credit
+                if not (opening or period_debit or period_credit):
+                    continue
+                line = TrialBalanceLine(
+                    trial_balance=trial_balance,
+                    account_id=account_id,
+                    opening_debit=max(opening, 0),
+                    opening_credit=max(-opening, 0),
+                    period_debit=period_debit,
+                    period_credit=period_credit,
+                    closing_debit=max(closing, 0),
+                    closing_credit=max(-closing, 0),
+                )
+                total_debits += line.closing_debit
+                total_credits += line.closing_credit
+                batch.append(line)
+                if len(batch) >= TRIAL_BALANCE_BATCH_SIZE:
+                    TrialBalanceLine.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                TrialBalanceLine.objects.bulk_create(batch)
+            
+            trial_balance.total_debits = total_debits
+            trial_balance.total_credits = total_credits
+            trial_balance.is_balanced = trial_balance.total_debits == trial_balance.total_credits
+            if as_of_date:
+                trial_balance.as_of_date = as_of_date
+            trial_balance.save(update_fields=[
+                'total_debits', 'total_credits', 'is_balanced', 'as_of_date', 'updated_at'
+            ])
+        
+        return trial_balance
+    
     def get_balance(self):
         """Get the balance (should be zero if balanced)."""
         return self.total_debits - self.total_credits
 
 
+class TrialBalanceLineQuerySet(models.QuerySet):
+    """QuerySet helpers for trial balance lines."""
+    
+    def recalculate_closing(self):
+        """
+        Roll opening balances and period movements forward into the closing columns in one UPDATE.
+        
+        A net debit balance goes to closing_debit and a net credit balance to
+        closing_credit. Returns the number of lines updated.
+        """
+        closing = (
+            F('opening_debit') - F('opening_credit') +
+            F('period_debit') - F('period_credit')
+        )
+        zero = Value(0)
+        return self.update(
+            closing_debit=Greatest(closing, zero),
+            closing_credit=Greatest(-closing, zero),
+        )
+
+
+class TrialBalanceLineManager(models.Manager.from_queryset(TrialBalanceLineQuerySet)):
+    """Default manager that joins the account rendered with every line."""
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('account', 'trial_balance')
+
+
 class TrialBalanceLine(models.Model):
     """
     Individual line items in trial balance.
@@ -383,12 +696,23 @@ class TrialBalanceLine(models.Model):
     )
     
     # Balances
-    opening_debit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    opening_credit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    period_debit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    period_credit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    closing_debit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
-    closing_credit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    opening_debit = MoneyField(default=Decimal('0.00'))
+    opening_credit = MoneyField(default=Decimal('0.00'))
+    period_debit = MoneyField(default=Decimal('0.00'))
+    period_credit = MoneyField(default=Decimal('0.00'))
+    closing_debit = MoneyField(default=Decimal('0.00'))
+    closing_credit = MoneyField(default=Decimal('0.00'))
+    
+    objects = TrialBalanceLineManager()
+    
+    AMOUNT_FIELDS = [
+        'opening_debit',
+        'opening_credit',
+        'period_debit',
+        'period_credit',
+        'closing_debit',
+        'closing_credit',
+    ]
     
     class Meta:
         verbose_name = _('Trial Balance Line')
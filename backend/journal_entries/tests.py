@@ -0,0 +1,148 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from accounts.models import User
+from chart_of_accounts.models import AccountCategory, AccountGroup, AccountType, ChartOfAccount
+
+from .models import JournalEntry, JournalEntryLine, TrialBalance
+
+
+class LedgerTestCase(TestCase):
+    """Base test case with a user and two cash accounts."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='accountant', password='x', role='admin')
+        category = AccountCategory.objects.create(name='Assets', code='1', category_type='assets')
+        group = AccountGroup.objects.create(category=category, name='Current Assets', code='1')
+        account_type = AccountType.objects.create(group=group, name='Cash', code='1', normal_balance='debit')
+        cls.cash, cls.bank = [
+            ChartOfAccount.objects.create(
+                category=category,
+                group=group,
+                type=account_type,
+                account_number=number,
+                account_name=name,
+                normal_balance='debit',
+                created_by=cls.user,
+            )
+            for number, name in [('001', 'Cash'), ('002', 'Bank')]
+        ]
+    
+    def create_entry(self, amount, status='draft'):
+        """Create an entry moving amount from the bank to cash, then set its status."""
+        entry = JournalEntry.objects.create(
+            entry_date=date(2026, 1, 15),
+            description='Cash withdrawal',
+            fiscal_year=2026,
+            fiscal_period=1,
+            created_by=self.user,
+        )
+        entry.add_lines([
+            JournalEntryLine(account=self.cash, line_number=1, description='Cash', debit_amount=amount),
+            JournalEntryLine(account=self.bank, line_number=2, description='Bank', credit_amount=amount),
+        ])
+        JournalEntry.objects.filter(pk=entry.pk).update(status=status)
+        entry.refresh_from_db()
+        return entry
+
+
+class JournalEntryTotalsTests(LedgerTestCase):
+    """Totals kept by the line triggers and checked by je_balanced."""
+    
+    def debit_line(self, entry):
+        return entry.lines.filter(debit_amount__gt=0)
+    
+    def test_adding_lines_sets_totals(self):
+        entry = self.create_entry(Decimal('12.34'))
+        
+        self.assertEqual((entry.total_debits, entry.total_credits), (Decimal('12.34'), Decimal('12.34')))
+    
+    def test_updating_lines_adjusts_totals(self):
+        entry = self.create_entry(Decimal('12.34'))
+        
+        self.debit_line(entry).update(debit_amount=Decimal('20.00'))
+        
+        entry.refresh_from_db()
+        self.assertEqual((entry.total_debits, entry.total_credits), (Decimal('20.00'), Decimal('12.34')))
+    
+    def test_deleting_lines_adjusts_totals(self):
+        entry = self.create_entry(Decimal('12.34'))
+        
+        entry.lines.filter(credit_amount__gt=0).delete()
+        
+        entry.refresh_from_db()
+        self.assertEqual((entry.total_debits, entry.total_credits), (Decimal('12.34'), Decimal('0.00')))
+    
+    def test_unbalancing_a_posted_entry_is_rejected(self):
+        entry = self.create_entry(Decimal('12.34'), status='posted')
+        
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.debit_line(entry).update(debit_amount=Decimal('20.00'))
+    
+    def test_unbalanced_draft_cannot_leave_draft(self):
+        entry = self.create_entry(Decimal('12.34'))
+        self.debit_line(entry).update(debit_amount=Decimal('20.00'))
+        
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JournalEntry.objects.filter(pk=entry.pk).update(status='pending')
+    
+    def test_line_with_debit_and_credit_is_rejected(self):
+        entry = self.create_entry(Decimal('12.34'))
+        
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JournalEntryLine.objects.create(
+                journal_entry=entry,
+                account=self.cash,
+                line_number=3,
+                description='Both sides',
+                debit_amount=Decimal('1.00'),
+                credit_amount=Decimal('1.00'),
+            )
+
+
+class JournalEntryNumberTests(LedgerTestCase):
+    """Entry numbers allocated on insert."""
+    
+    def test_save_numbers_entries_for_given_day(self):
+        entries = [
+            JournalEntry(
+                entry_date=date(2026, 1, 15),
+                description=f'Import {n}',
+                fiscal_year=2026,
+                fiscal_period=1,
+                created_by=self.user,
+            )
+            for n in range(2)
+        ]
+        
+        for entry in entries:
+            entry.save(today=date(2025, 3, 1))
+        
+        self.assertEqual([entry.entry_number for entry in entries], ['JE2025030001', 'JE2025030002'])
+
+
+class TrialBalanceGenerateTests(LedgerTestCase):
+    """Building trial balances from posted entries."""
+    
+    def test_generate_balances_posted_entries(self):
+        self.create_entry(Decimal('25.00'), status='posted')
+        
+        trial_balance = TrialBalance.generate(2026, 1, self.user)
+        
+        self.assertTrue(trial_balance.is_balanced)
+        self.assertEqual(trial_balance.total_debits, Decimal('25.00'))
+        self.assertEqual(trial_balance.lines.count(), 2)
+    
+    def test_regenerate_removes_lines_without_activity(self):
+        entry = self.create_entry(Decimal('25.00'), status='posted')
+        TrialBalance.generate(2026, 1, self.user)
+        JournalEntry.objects.filter(pk=entry.pk).update(status='cancelled')
+        
+        trial_balance = TrialBalance.generate(2026, 1, self.user)
+        
+        self.assertEqual(trial_balance.lines.count(), 0)
+        self.assertEqual(trial_balance.total_debits, Decimal('0.00'))
@@ -0,0 +1,80 @@
+"""
+Database-side maintenance of journal entry totals.
+
+Statement-level triggers on the lines table fold every inserted, updated or
+deleted line into its entry's total_debits and total_credits, so the totals
+stay correct for bulk_create(), queryset.update() and raw SQL alike. Working
+per statement rather than per row means a multi-line insert moves an entry
+from one balanced state to the next, which the je_balanced CHECK requires.
+"""
+from django.db import connections
+
+TOTALS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ipsas_journal_entry_totals() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE {entries} AS entry
+        SET total_debits = entry.total_debits + delta.debits,
+            total_credits = entry.total_credits + delta.credits
+        FROM (
+            SELECT journal_entry_id, SUM(debit_amount) AS debits, SUM(credit_amount) AS credits
+            FROM new_lines GROUP BY journal_entry_id
+        ) AS delta
+        WHERE entry.id = delta.journal_entry_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE {entries} AS entry
+        SET total_debits = entry.total_debits - delta.debits,
+            total_credits = entry.total_credits - delta.credits
+        FROM (
+            SELECT journal_entry_id, SUM(debit_amount) AS debits, SUM(credit_amount) AS credits
+            FROM old_lines GROUP BY journal_entry_id
+        ) AS delta
+        WHERE entry.id = delta.journal_entry_id;
+    ELSE
+        UPDATE {entries} AS entry
+        SET total_debits = entry.total_debits + delta.debits,
+            total_credits = entry.total_credits + delta.credits
+        FROM (
+            SELECT journal_entry_id, SUM(debit_amount) AS debits, SUM(credit_amount) AS credits
+            FROM (
+                SELECT journal_entry_id, debit_amount, credit_amount FROM new_lines
+                UNION ALL
+                SELECT journal_entry_id, -debit_amount, -credit_amount FROM old_lines
+            ) AS changes
+            GROUP BY journal_entry_id
+        ) AS delta
+        WHERE entry.id = delta.journal_entry_id
+          AND (delta.debits <> 0 OR delta.credits <> 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Transition tables are only allowed on single-event triggers, so each
+# event gets its own trigger sharing the one function
+TOTALS_TRIGGERS = {
+    'journal_lines_totals_insert': 'AFTER INSERT ON {lines} REFERENCING NEW TABLE AS new_lines',
+    'journal_lines_totals_update': 'AFTER UPDATE ON {lines} REFERENCING OLD TABLE AS old_lines NEW TABLE AS new_lines',
+    'journal_lines_totals_delete': 'AFTER DELETE ON {lines} REFERENCING OLD TABLE AS old_lines',
+}
+
+
+def install_totals_triggers(sender, using='default', **kwargs):
+    """post_migrate handler: install the triggers maintaining journal entry totals."""
+    from .models import JournalEntry, JournalEntryLine
+    
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    
+    entries = connection.ops.quote_name(JournalEntry._meta.db_table)
+    lines = connection.ops.quote_name(JournalEntryLine._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(TOTALS_FUNCTION.format(entries=entries))
+        for name, definition in TOTALS_TRIGGERS.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON {lines}")
+            cursor.execute(
+                f"CREATE TRIGGER {name} {definition.format(lines=lines)} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION ipsas_journal_entry_totals()"
+            )